@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+# Long-lived engine process. The referee starts ai1.py / ai2.py once per message;
+# with AgentShim.py as that script, each message is forwarded here instead, so the
+# agent (its transposition table, MCTS tree and warm caches) survives between moves.
+#
+# A server is named after its agent, its player and the directory it runs from, so
+# a server left over from another agent or checkout is never asked for a move. Its
+# socket and session key live in a directory only this user can enter; the shim
+# that starts a server picks a random key, hands it over on stdin and leaves it in
+# a 0600 key file for the shims of later moves. Messages are plain utf-8 bytes.
+import os
+import sys
+import stat
+import time
+import socket
+import hashlib
+import tempfile
+import threading
+import traceback
+import subprocess
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+IDLE_TIMEOUT = 600
+# A fresh server listens within about 0.1 s; a longer wait only eats into the move.
+CONNECT_TIMEOUT = 1.0
+MOVE_TIME_LIMIT = 7
+# With no request for this long the game is over or stalled: stop pondering.
+PONDER_IDLE_TIMEOUT = 2 * MOVE_TIME_LIMIT
+# An in-process answer leaves this much of the move's time for its own start-up and exit.
+FALLBACK_MARGIN = 0.5
+# With less time than this left, the fallback plays a rule-based move instead of
+# loading and running a search.
+MIN_FALLBACK_TIME = 1.0
+KEY_BYTES = 32
+AGENT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def runtimeDirectory():
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    if sys.platform == "win32":
+        # The temp directory is already per user on Windows.
+        path = os.path.join(base, "ataxx")
+        os.makedirs(path, exist_ok=True)
+        return path
+    path = os.path.join(base, "ataxx-{}".format(os.getuid()))
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise OSError("Refusing to use {}: not a private directory of this user".format(path))
+    return path
+
+
+def serverName(agentName, player):
+    directoryHash = hashlib.sha1(AGENT_DIRECTORY.encode("utf-8")).hexdigest()[:12]
+    return "{}-ai{}-{}".format(agentName, player, directoryHash)
+
+
+def serverAddress(agentName, player):
+    if sys.platform == "win32":
+        return r"\\.\pipe\ataxx-{}".format(serverName(agentName, player))
+    return os.path.join(runtimeDirectory(), serverName(agentName, player) + ".sock")
+
+
+def keyPath(agentName, player):
+    return os.path.join(runtimeDirectory(), serverName(agentName, player) + ".key")
+
+
+def _readKey(path):
+    try:
+        with open(path, "rb") as keyFile:
+            return keyFile.read()
+    except OSError:
+        return None
+
+
+def _writeKey(path, key):
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "wb") as keyFile:
+        keyFile.write(key)
+
+
+def _removeStaleSocket(address):
+    # Only a socket of this user that nobody listens on is removed; anything else
+    # is left alone, and binding to it then fails.
+    try:
+        info = os.lstat(address)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(address)
+    except ConnectionRefusedError:
+        os.remove(address)
+    finally:
+        probe.close()
+
+
+def createAgent(agentName, player, timeLimit=MOVE_TIME_LIMIT, ponder=True):
+    # Imported here so the shim, which only needs serverAddress/forward, stays cheap to start.
+    # AlphaBeta and MCTS are built by the same factory as their one-shot scripts.
+    if agentName == "Random":
+        from RandomAgent import RandomAgent
+        return RandomAgent()
+    elif agentName == "AlphaBeta":
+        from AlphaBetaAgent import createEngineAgent
+        return createEngineAgent(player, timeLimit=timeLimit, ponder=ponder)
+    elif agentName == "MCTS":
+        from MCTSAgent import createEngineAgent
+        return createEngineAgent(player, timeLimit=timeLimit, ponder=ponder)
+    elif agentName == "RuleBased":
+        from RuleBasedAgent import RuleBasedAgent
+        return RuleBasedAgent(player=player)
+    raise ValueError("Unknown agent: {}".format(agentName))
+
+
+def parseState(input_str, player):
+    from AtaxxState import AtaxxState
+
+    board = []
+    lines = input_str.split("\n")
+    for i in range(7):
+        line = list(map(lambda x: int(x), lines[i+1].split(" ")))
+        board.append(line)
+    return AtaxxState(board=board, turn=player)
+
+
+class AgentServer(object):
+    def __init__(self, agentName, player, address=None, key=None, idleTimeout=IDLE_TIMEOUT):
+        # key: the session key clients must prove; required by serveForever.
+        self.agentName = agentName
+        self.player = player
+        self.address = address if address is not None else serverAddress(agentName, player)
+        self.key = key
+        self.idleTimeout = idleTimeout
+        self.agent = createAgent(agentName, player)
+        # With ATAXX_GAME_RECORD set, every game is appended there in the GameRecord
+        # format when the next one starts or the server exits.
+        from GameRecord import openGameRecorder
+        self.recorder = openGameRecorder(os.environ.get("ATAXX_GAME_RECORD"), agentName, player)
+
+        self._lastRequest = time.time()
+
+    def handleMessage(self, input_str, startTime=None):
+        # startTime: when the message arrived; the move's time counts from there.
+        if input_str.startswith("READY"):
+            # A new game starts: drop whatever the previous game left behind.
+            if hasattr(self.agent, "stopPondering"):
+                self.agent.stopPondering()
+            if self.recorder is not None:
+                self.recorder.finish()
+            self.agent = createAgent(self.agentName, self.player)
+            return "OK"
+
+        elif input_str.startswith("PLAY"):
+            if startTime is None:
+                startTime = time.time()
+            state = parseState(input_str, self.player)
+            if self.recorder is not None:
+                self.recorder.observe(state)
+            action = self.agent.getAction(state=state, startTime=startTime)
+            if self.recorder is not None:
+                self.recorder.played(action, time.time() - startTime)
+            return "{} {} {} {}" .format(*action)
+        return ""
+
+    def _answer(self, request, receivedTime):
+        # A message the agent cannot handle gets an empty reply, as an unknown one
+        # does; the server keeps its agent for the messages that follow.
+        try:
+            return self.handleMessage(request.decode("utf-8"), receivedTime).encode("utf-8")
+        except Exception:
+            traceback.print_exc()
+            return b""
+
+    def _watchIdle(self):
+        while time.time() - self._lastRequest < self.idleTimeout:
+            time.sleep(1)
+            agent = self.agent
+            if time.time() - self._lastRequest >= PONDER_IDLE_TIMEOUT and hasattr(agent, "stopPondering"):
+                agent.stopPondering()
+        if self.recorder is not None:
+            self.recorder.finish()
+        if sys.platform != "win32":
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+        os._exit(0)
+
+    def serveForever(self):
+        if sys.platform != "win32":
+            _removeStaleSocket(self.address)
+        listener = Listener(self.address, authkey=self.key)
+        watchdog = threading.Thread(target=self._watchIdle)
+        watchdog.daemon = True
+        watchdog.start()
+
+        with listener:
+            while True:
+                try:
+                    connection = listener.accept()
+                except (AuthenticationError, OSError, EOFError):
+                    continue
+                with connection:
+                    self._lastRequest = time.time()
+                    try:
+                        request = connection.recv_bytes()
+                        connection.send_bytes(self._answer(request, time.time()))
+                    except (OSError, EOFError):
+                        # The shim went away mid-request; the next one reconnects.
+                        pass
+                    self._lastRequest = time.time()
+
+
+def _spawnServer(agentName, player, key):
+    # The key goes over stdin, where other users cannot read it as they could argv.
+    serverScript = os.path.join(AGENT_DIRECTORY, "AgentServer.py")
+    options = {"stdin": subprocess.PIPE, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL,
+               "cwd": AGENT_DIRECTORY}
+    if sys.platform == "win32":
+        options["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options["start_new_session"] = True
+    process = subprocess.Popen([sys.executable, serverScript, agentName, str(player)], **options)
+    process.stdin.write(key.hex().encode("ascii") + b"\n")
+    process.stdin.close()
+
+
+def _connect(address, key, timeout):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return Client(address, authkey=key)
+        except (OSError, EOFError, AuthenticationError):
+            if time.time() >= deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _connectOrSpawn(agentName, player):
+    # Resolving the address raises OSError as well, e.g. for a runtime directory
+    # that is not private to this user.
+    address, path = serverAddress(agentName, player), keyPath(agentName, player)
+    key = _readKey(path)
+    if key is not None:
+        try:
+            return _connect(address, key, 0)
+        except (OSError, EOFError, AuthenticationError):
+            pass
+    key = os.urandom(KEY_BYTES)
+    _writeKey(path, key)
+    _spawnServer(agentName, player, key)
+    return _connect(address, key, CONNECT_TIMEOUT)
+
+
+def _answerInProcess(agentName, player, input_str, startTime):
+    # No engine could be reached, or it dropped the connection: answer here rather
+    # than forfeit the move, on the time the move has left.
+    if not input_str.startswith("PLAY"):
+        return "OK" if input_str.startswith("READY") else ""
+    # The agent's clock starts with the shim's, so loading the agent counts against the move.
+    state = parseState(input_str, player)
+    if MOVE_TIME_LIMIT - FALLBACK_MARGIN - (time.time() - startTime) < MIN_FALLBACK_TIME:
+        from RuleBasedAgent import RuleBasedAgent
+        action = RuleBasedAgent(player).getAction(state)
+    else:
+        agent = createAgent(agentName, player, timeLimit=MOVE_TIME_LIMIT - FALLBACK_MARGIN, ponder=False)
+        action = agent.getAction(state=state, startTime=startTime)
+    return "{} {} {} {}" .format(*action)
+
+
+def forward(agentName, player, input_str):
+    # Sends one referee message to the engine for this player, starting it if needed.
+    startTime = time.time()
+    try:
+        with _connectOrSpawn(agentName, player) as connection:
+            connection.send_bytes(input_str.encode("utf-8"))
+            return connection.recv_bytes().decode("utf-8")
+    except (OSError, EOFError, AuthenticationError):
+        return _answerInProcess(agentName, player, input_str, startTime)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, AGENT_DIRECTORY)
+    sessionKey = bytes.fromhex(sys.stdin.readline().strip())
+    if not sessionKey:
+        sys.exit("AgentServer expects its session key on stdin")
+    AgentServer(agentName=sys.argv[1], player=int(sys.argv[2]), key=sessionKey).serveForever()
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+# Copy as ai1.py / ai2.py (with AgentServer.py and the agent files) to play through
+# a persistent AgentServer instead of starting a fresh engine for every message.
+import os
+import sys
+
+from AgentServer import forward
+
+AGENT_NAME = "AlphaBeta"
+
+
+if __name__ == "__main__":
+    input_str = sys.stdin.read()
+    player = int(os.path.basename(__file__)[2])
+    sys.stdout.write(forward(AGENT_NAME, player, input_str))
@@ -1,85 +1,133 @@
 # -*- coding: utf-8 -*-
+import time
+# Read before the other imports: a one-shot move (ai1.py / ai2.py) is timed from here,
+# since the referee's clock runs while they load.
+PROCESS_START = time.time()
+
+import os
 import sys
-import copy
+import ctypes
 import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.sharedctypes import RawValue
+
+from AtaxxState import AtaxxState, BOARD_SIZE, NUM_SQUARES, NEIGHBOR_MASKS, popcount
+from EndgameSolver import EndgameSolver
+from OpeningBook import openOpeningBook
+from PatternEvaluation import WEIGHT_SCALE, openPatternEvaluator
+from Pondering import Ponderer, ponderTimeLimit
+from SearchLog import openSearchLog
+from TimeManager import TimeManager
+from TranspositionTable import TranspositionTable, SharedTranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# Leaf values are (piece difference) * DEPTH_SCALE + remaining depth; DEPTH_SCALE must
+# exceed any search depth so the depth bonus only breaks ties.
+DEPTH_SCALE = 64
+WIN_VALUE = 100 * DEPTH_SCALE
+INFINITY = 2 * WIN_VALUE
+MAX_EVAL = NUM_SQUARES * DEPTH_SCALE
+MAX_PLY = 128
+# Iterative deepening searches depth >= ASPIRATION_MIN_DEPTH in a window of
+# +-ASPIRATION_WINDOW around the value found two depths earlier.
+ASPIRATION_WINDOW = DEPTH_SCALE
+ASPIRATION_MIN_DEPTH = 3
+# The clock is read every TIME_CHECK_MASK + 1 nodes: a few milliseconds at the
+# slowest (pattern-evaluated) node rate, for a negligible cost per node.
+TIME_CHECK_MASK = 63
+
+# Move-ordering keys: killers above every capture count, captures above clone-vs-jump,
+# clone-vs-jump above the history score.
+KILLER_BONUS = 1 << 40
+CAPTURE_WEIGHT = 1 << 22
+CLONE_BONUS = 1 << 21
+HISTORY_LIMIT = (1 << 21) - 1
+# Lazy SMP helpers start from random history scores below this, so their move
+# orders, and with them the parts of the tree they reach first, differ.
+HELPER_HISTORY_NOISE = 1 << 10
+# The deployed engine counts material unless this is set: pattern evaluation costs
+# about 10% more per node and has not yet beaten material at the deployed time control.
+PATTERN_EVALUATION = False
+
+
+class SearchTimeout(Exception):
+    pass
 
 
-class AtaxxState(object):
-    def __init__(self, board, turn):
-        self.board = board
-        self.turn = turn
-        self.possibleActions = None
-        self._updatePossibleActions()
-
-    def _updatePossibleActions(self):
-        possibleActions = []
-        dupDirection = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        movDirection = [(-2, -2), (-2, -1), (-2, 0), (-2, 1), (-2, 2), (-1, -2), (-1, 2), (0, -2),
-                        (0, 2), (1, -2), (1, 2), (2, -2), (2, -1), (2, 0), (2, 1), (2, 2)]
-
-        for i in range(7):
-            for j in range(7):
-                if self.board[i][j] == 0:
-                    for direction in dupDirection:
-                        x, y = i + direction[0], j + direction[1]
-                        if 0 <= x < 7 and 0 <= y < 7 and self.board[x][y] == self.turn:
-                            possibleActions.append((x, y, i, j))
-                            break
+class Agent(object):
+    def __init__(self):
+        pass
 
-        for i in range(7):
-            for j in range(7):
-                if self.board[i][j] == 0:
-                    for direction in movDirection:
-                        x, y = i + direction[0], j + direction[1]
-                        if 0 <= x < 7 and 0 <= y < 7 and self.board[x][y] == self.turn:
-                            possibleActions.append((x, y, i, j))
-        self.possibleActions = possibleActions
-
-    def step(self, action):
-        x, y, i, j = action
+    def getAction(self, state):
+        pass
 
-        board = copy.deepcopy(self.board)
-        board[i][j] = self.turn
-        if abs(x - i) == 2 or abs(y - j) == 2:
-            board[x][y] = 0
 
-        for k in range(max(0, i - 1), min(7, i + 2)):
-            for l in range(max(0, j - 1), min(7, j + 2)):
-                if board[k][l] == 3 - self.turn:
-                    board[k][l] = self.turn
+_helperTable, _helperStop, _helperEvaluator = None, None, None
 
-        turn = 3 - self.turn
-        nextState = AtaxxState(board=board, turn=turn)
-        return nextState
 
-    def isTerminal(self):
-        return len(self.possibleActions) == 0
+def _initLazySmpHelper(tableWords, stopFlag, evaluator):
+    global _helperTable, _helperStop, _helperEvaluator
+    _helperTable = SharedTranspositionTable(words=tableWords)
+    _helperStop, _helperEvaluator = stopFlag, evaluator
 
-    def winner(self):
-        playerScores = [None, 0, 0]
-        for i in range(7):
-            for j in range(7):
-                if self.board[i][j] == self.turn:
-                    playerScores[self.turn] += 1
-                else:
-                    playerScores[3 - self.turn] += 1
-        return 1 if playerScores[1] > playerScores[2] else 2
 
-
-class Agent(object):
-    def __init__(self):
-        pass
-
-    def getAction(self, state):
-        pass
+def _lazySmpSearch(pieces, turn, deadline, maxDepth, helperIndex):
+    # Runs in a helper process: iterative deepening on the same root through the
+    # shared table, odd helpers one depth ahead. Returns (depth, value, action, nodes).
+    agent = AlphaBetaAgent(maxDepth, player=turn, ttMemoryBudget=0, endgameThreshold=0, evaluator=_helperEvaluator)
+    agent.transpositionTable, agent._sharedStop = _helperTable, _helperStop
+    noise = random.Random(helperIndex)
+    agent._history = [noise.randrange(HELPER_HISTORY_NOISE) for _ in agent._history]
+    action = agent._iterativeDeepening(AtaxxState.fromBitboards(pieces, turn), deadline, 1 + helperIndex % 2)
+    return agent.completedDepth, agent.rootValue, action, agent.nodes
 
 
 class AlphaBetaAgent(Agent):
-    def __init__(self, maxDepth, player, adaptiveDepth=False):
+    def __init__(self, maxDepth, player, adaptiveDepth=False, ttMemoryBudget=16 * 1024 * 1024, timeLimit=None,
+                 moveOrdering=True, openingBook=None, endgameThreshold=3, endgameTimeShare=0.25, ponder=False,
+                 searchLog=None, evaluator=None, numWorkers=1, timeManager=None):
         super(AlphaBetaAgent, self).__init__()
         self.maxDepth = maxDepth
         self.player = player
         self.adaptiveDepth = adaptiveDepth
+        self.transpositionTable = TranspositionTable(ttMemoryBudget) if ttMemoryBudget else None
+        # numWorkers > 1 runs Lazy SMP on timed searches: numWorkers - 1 helper
+        # processes search the same root and share the table with this one. It is
+        # capped at the number of cores: helpers sharing a core only slow the search,
+        # and every probe of the shared table costs more than one of a local table.
+        self.numWorkers = min(numWorkers, os.cpu_count() or 1) if ttMemoryBudget else 1
+        if self.numWorkers > 1:
+            self.transpositionTable = SharedTranspositionTable(ttMemoryBudget)
+        self.timeLimit = timeLimit
+        # timeLimit caps every move; a timeManager may end a search before it.
+        self.timeManager = timeManager
+        self.moveOrdering = moveOrdering
+        self.openingBook = openingBook
+        self.endgameSolver = EndgameSolver(emptyThreshold=endgameThreshold) if endgameThreshold > 0 else None
+        self.endgameTimeShare = endgameTimeShare
+        self.ponder = ponder
+        self.searchLog = searchLog
+        self.evaluator = evaluator
+        self.nodes = 0
+        self.cutoffs = 0
+        self.firstMoveCutoffs = 0
+        self.completedDepth = 0
+        self.rootValue = 0
+        self.ponderDepth = 0
+        self.helperNodes = 0
+        self.depthStats = []
+        self.actionSource = None
+        self._moveNumber = 0
+
+        self._killers = [[None, None] for _ in range(MAX_PLY)]
+        self._history = [0] * (NUM_SQUARES * NUM_SQUARES)
+
+        self._deadline = None
+        self._pvActions = {}
+        self._rootAction = None
+        self._ponderer = Ponderer()
+        self._pool = None
+        self._helperStop = None
+        self._sharedStop = None
 
     def _getAdaptiveDepth(self, state):
         numActions = len(state.possibleActions)
@@ -91,61 +139,343 @@ class AlphaBetaAgent(Agent):
         return maxDepth
 
 
-    def _alphaBeta(self, state, depth, alpha, beta, maximizingPlayer):
+    def _orderedActions(self, state, firstAction, ply):
+        firstAction = self._pvActions.get(state.hash, firstAction)
+        if firstAction is not None:
+            yield firstAction
+        if not self.moveOrdering:
+            for action in state.iterActions():
+                if action != firstAction:
+                    yield action
+            return
+
+        opp = state.pieces[3 - state.turn]
+        killers, history = self._killers[ply], self._history
+        scoredActions = []
+        for action in state.iterActions():
+            if action == firstAction:
+                continue
+            x, y, i, j = action
+            src, dst = x * BOARD_SIZE + y, i * BOARD_SIZE + j
+            score = popcount(NEIGHBOR_MASKS[dst] & opp) * CAPTURE_WEIGHT + min(history[src * NUM_SQUARES + dst], HISTORY_LIMIT)
+            if abs(x - i) <= 1 and abs(y - j) <= 1:
+                score += CLONE_BONUS
+            if action == killers[0] or action == killers[1]:
+                score += KILLER_BONUS
+            scoredActions.append((score, action))
+        scoredActions.sort(key=lambda scoredAction: scoredAction[0], reverse=True)
+        for _, action in scoredActions:
+            yield action
+
+    def _recordCutoff(self, action, depth, ply, moveIndex):
+        self.cutoffs += 1
+        if moveIndex == 0:
+            self.firstMoveCutoffs += 1
+        killers = self._killers[ply]
+        if killers[0] != action:
+            killers[1], killers[0] = killers[0], action
+        x, y, i, j = action
+        self._history[(x * BOARD_SIZE + y) * NUM_SQUARES + i * BOARD_SIZE + j] += depth * depth
+
+    def _negamax(self, state, depth, alpha, beta, ply=0):
+        # Principal-variation search, fail-soft: values are from the side to move,
+        # the first child gets the full window and later ones a null window, re-searched
+        # only when they land inside it. At the root, the best move goes to self._rootAction.
+        self.nodes += 1
+        if self._deadline is not None and self.nodes & TIME_CHECK_MASK == 0 and \
+                (time.time() >= self._deadline or self._ponderer.stopEvent.is_set() or
+                 self._sharedStop is not None and self._sharedStop.value):
+            raise SearchTimeout()
         if depth == 0 or state.isTerminal():
-            return self._heuristicValue(state, depth), None
-
-        chosenAction = None
-        if maximizingPlayer:
-            value = -sys.maxsize
-            for action in state.possibleActions:
-                child = state.step(action)
-                childValue, _ = self._alphaBeta(child, depth - 1, alpha, beta, False)
-                if value < childValue:
-                    chosenAction = action
-                    value = childValue
-                alpha = max(alpha, value)
-                if alpha >= beta:
-                    break
-            return value, chosenAction
-
+            value = self._heuristicValue(state, depth)
+            return value if state.turn == self.player else -value
+
+        table, ttAction = self.transpositionTable, None
+        if table is not None:
+            entry = table.probe(state.hash)
+            if entry is not None:
+                _, entryDepth, flag, entryValue, ttAction = entry
+                if entryDepth >= depth:
+                    if flag == EXACT:
+                        if ply == 0:
+                            self._rootAction = ttAction
+                        return entryValue
+                    elif flag == LOWER_BOUND:
+                        alpha = max(alpha, entryValue)
+                    else:
+                        beta = min(beta, entryValue)
+                    if alpha >= beta:
+                        if ply == 0:
+                            self._rootAction = ttAction
+                        return entryValue
+
+        # The flag is judged against the window as narrowed by the table.
+        alphaOrig = alpha
+        value, chosenAction = -INFINITY, None
+        for moveIndex, action in enumerate(self._orderedActions(state, ttAction, ply)):
+            undoRecord = state.make(action)
+            if moveIndex == 0:
+                childValue = -self._negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                childValue = -self._negamax(state, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < childValue < beta:
+                    # Fail-soft: the probe's value is a lower bound, so the re-search window starts just below it.
+                    childValue = -self._negamax(state, depth - 1, -beta, -(childValue - 1), ply + 1)
+            state.unmake(undoRecord)
+            if childValue > value:
+                chosenAction = action
+                value = childValue
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        self._recordCutoff(action, depth, ply, moveIndex)
+                        break
+
+        if table is not None:
+            if value <= alphaOrig:
+                flag = UPPER_BOUND
+            elif value >= beta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            table.store(state.hash, depth, flag, value, chosenAction)
+        if ply == 0:
+            self._rootAction = chosenAction
+        return value
+
+    def _searchRoot(self, state, depth, guess=None):
+        # Aspiration window around guess, widened on the failing side until the
+        # value falls inside; returns (value, action).
+        if guess is None or depth < ASPIRATION_MIN_DEPTH or abs(guess) >= WIN_VALUE - DEPTH_SCALE:
+            alpha, beta = -INFINITY, INFINITY
         else:
-            value = sys.maxsize
-            for action in state.possibleActions:
-                child = state.step(action)
-                childValue, _ = self._alphaBeta(child, depth - 1, alpha, beta, True)
-                if value > childValue:
-                    chosenAction = action
-                    value = childValue
-                beta = min(beta, value)
-                if beta <= alpha:
-                    break
-            return value, chosenAction
+            alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+        delta = ASPIRATION_WINDOW
+        while True:
+            self._rootAction = None
+            value = self._negamax(state.copy(), depth, alpha, beta)
+            if value <= alpha and alpha > -INFINITY:
+                alpha = max(value - delta, -INFINITY)
+            elif value >= beta and beta < INFINITY:
+                beta = min(value + delta, INFINITY)
+            else:
+                return value, self._rootAction
+            delta *= 2
 
     def _heuristicValue(self, state, depth):
         if state.isTerminal():
             if state.winner() == self.player:
-                return 100 * (self.maxDepth + 1) + depth
+                return WIN_VALUE + depth
             else:
-                return -100 * (self.maxDepth + 1) + depth
+                return -WIN_VALUE + depth
+
+        if self.evaluator is not None:
+            # Clamped below any win value so a pattern score never reads as a proven result.
+            value = self.evaluator.evaluate(state, self.player) * DEPTH_SCALE // WEIGHT_SCALE
+            return max(-MAX_EVAL, min(MAX_EVAL, value)) + depth
+
+        playerScore, enemyScore = state.score(self.player), state.score(3 - self.player)
+        return (playerScore - enemyScore) * DEPTH_SCALE + depth
+
+    def _principalVariation(self, state, depth):
+        pvActions = {}
+        state = state.copy()
+        for _ in range(depth):
+            entry = self.transpositionTable.probe(state.hash) if self.transpositionTable is not None else None
+            if entry is None or entry[4] is None:
+                break
+            pvActions[state.hash] = entry[4]
+            state.make(entry[4])
+        return pvActions
+
+    def _iterativeDeepening(self, state, deadline, firstDepth=1):
+        # Always answers with the root move of the last fully searched depth.
+        self._deadline = deadline
+        self._pvActions = {}
+        bestAction = state.possibleActions[0] if state.possibleActions else None
+        values = [None] * firstDepth
+        try:
+            for depth in range(firstDepth, self.maxDepth + 1):
+                depthStart, nodes, cutoffs = time.time(), self.nodes, self.cutoffs
+                # Values swing by a capture between odd and even depths (whoever moves
+                # last gains), so the window is centred on the last depth of the same parity.
+                value, action = self._searchRoot(state, depth, values[depth - 2] if depth > 2 else None)
+                values.append(value)
+                if action is not None:
+                    bestAction = action
+                self.completedDepth, self.rootValue = depth, value
+                self.depthStats.append({"depth": depth, "nodes": self.nodes - nodes, "cutoffs": self.cutoffs - cutoffs,
+                                        "seconds": time.time() - depthStart, "value": value})
+                self._pvActions = self._principalVariation(state, depth)
+                self._pvActions[state.hash] = bestAction
+                if abs(value) >= WIN_VALUE - DEPTH_SCALE:
+                    break
+                if self.timeManager is not None:
+                    # The next depth is assumed to grow by the mean factor of the last two,
+                    # which evens out the odd/even swing in depth times.
+                    seconds = [depthStat["seconds"] for depthStat in self.depthStats[-3:]]
+                    projected = 0.0
+                    if len(seconds) == 3 and seconds[0] > 0:
+                        projected = seconds[-1] * (seconds[-1] / seconds[0]) ** 0.5
+                    elif len(seconds) == 2 and seconds[0] > 0:
+                        projected = seconds[-1] * seconds[-1] / seconds[0]
+                    self.timeManager.observe(bestAction)
+                    if self.timeManager.timeUp(projected=projected):
+                        break
+        except SearchTimeout:
+            pass
+        finally:
+            self._deadline = None
+            self._pvActions = {}
+        return bestAction
+
+    def _lazySmp(self, state, deadline):
+        # Helpers and this process search until the deadline, or until this one
+        # finishes; the move comes from the deepest completed iteration, ties going
+        # to this process.
+        if self._pool is None:
+            self._helperStop = RawValue(ctypes.c_bool, False)
+            self._pool = ProcessPoolExecutor(max_workers=self.numWorkers - 1, initializer=_initLazySmpHelper,
+                                             initargs=(self.transpositionTable.words, self._helperStop, self.evaluator))
+        self._helperStop.value = False
+        futures = [self._pool.submit(_lazySmpSearch, list(state.pieces), state.turn, deadline, self.maxDepth, helper)
+                   for helper in range(1, self.numWorkers)]
+        bestAction = self._iterativeDeepening(state, deadline)
+        self._helperStop.value = True
+        for future in futures:
+            depth, value, action, nodes = future.result()
+            self.helperNodes += nodes
+            if depth > self.completedDepth and action is not None:
+                bestAction, self.completedDepth, self.rootValue = action, depth, value
+        return bestAction
+
+    def close(self):
+        self.stopPondering()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _resetSearchStats(self):
+        self.nodes, self.cutoffs, self.firstMoveCutoffs, self.helperNodes = 0, 0, 0, 0
+        self.completedDepth, self.depthStats = 0, []
+        self._killers = [[None, None] for _ in range(MAX_PLY)]
+        self._history = [value >> 1 for value in self._history]
+
+    def searchStats(self):
+        depth = max(self.completedDepth, 1)
+        return {
+            "nodes": self.nodes,
+            "helperNodes": self.helperNodes,
+            "depth": self.completedDepth,
+            "cutoffs": self.cutoffs,
+            "firstMoveCutoffRate": self.firstMoveCutoffs / self.cutoffs if self.cutoffs else 0.0,
+            "effectiveBranchingFactor": self.nodes ** (1.0 / depth),
+            "depths": self.depthStats,
+        }
+
+    def _logMove(self, state, action, seconds):
+        # Per-depth branching factor is this depth's node count over the previous one's.
+        previousNodes = None
+        for depthStat in self.depthStats:
+            depthStat["branchingFactor"] = depthStat["nodes"] / previousNodes if previousNodes else None
+            previousNodes = depthStat["nodes"]
+        record = {"agent": "AlphaBeta", "player": self.player, "move": self._moveNumber,
+                  "action": list(action) if action is not None else None, "source": self.actionSource,
+                  "seconds": seconds, "empty": popcount(state.empty())}
+        record.update(self.searchStats())
+        if self.timeManager is not None:
+            record["timeTarget"] = self.timeManager.target
+        if self.transpositionTable is not None:
+            record["transpositionTable"] = self.transpositionTable.stats()
+        self.searchLog.write(record)
+
+    def _ponder(self, state):
+        # Searches the opponent's position with our own evaluation; every reply's
+        # subtree lands in the transposition table, so the next search after the
+        # real reply starts from those entries.
+        self._deadline = time.time() + ponderTimeLimit(self.timeLimit)
+        self.ponderDepth = 0
+        try:
+            for depth in range(1, self.maxDepth + 1):
+                value, _ = self._searchRoot(state, depth)
+                self.ponderDepth = depth
+                if abs(value) >= WIN_VALUE - DEPTH_SCALE:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self._deadline = None
+
+    def stopPondering(self):
+        self._ponderer.stop()
+
+    def getAction(self, state, startTime=None):
+        # startTime: when the move's clock started, if before this call.
+        if startTime is None:
+            startTime = time.time()
+        self.stopPondering()
+        self._resetSearchStats()
+        if self.timeManager is not None:
+            # Forced and book moves never start the manager, so they log no target.
+            self.timeManager.reset()
+        self._moveNumber += 1
+        action = self._selectAction(state, startTime)
+        if self.searchLog is not None:
+            self._logMove(state, action, time.time() - startTime)
+        if self.ponder and self.transpositionTable is not None and action is not None:
+            nextState = state.step(action)
+            if not nextState.isTerminal():
+                self._ponderer.start(self._ponder, nextState)
+        return action
 
-        playerScore, enemyScore = 0, 0
-        for i in range(7):
-            for j in range(7):
-                if state.board[i][j] == self.player:
-                    playerScore += 1
-                elif state.board[i][j] == 3 - self.player:
-                    enemyScore += 1
-        return (playerScore - enemyScore) * (self.maxDepth + 1) + depth
+    def _selectAction(self, state, startTime):
+        if len(state.possibleActions) == 1:
+            self.actionSource = "forced"
+            return state.possibleActions[0]
+
+        if self.openingBook is not None:
+            action = self.openingBook.lookup(state)
+            if action is not None:
+                self.actionSource = "book"
+                return action
+
+        if self.timeLimit is not None:
+            # The manager's clock starts before the solver, so the solver's time comes
+            # out of the move's target and the solver gets a share of that target.
+            budget, deadline = self.timeLimit, startTime + self.timeLimit
+            if self.timeManager is not None:
+                self.timeManager.startMove(state, startTime, self.timeLimit)
+                budget, deadline = self.timeManager.target, self.timeManager.deadline
+            if self.endgameSolver is not None:
+                action = self.endgameSolver.provenAction(state, budget * self.endgameTimeShare)
+                if action is not None:
+                    self.actionSource = "endgame"
+                    return action
+
+        self.actionSource = "search"
+        if self.timeLimit is not None:
+            if self.numWorkers > 1:
+                return self._lazySmp(state, deadline)
+            return self._iterativeDeepening(state, deadline)
 
-    def getAction(self, state):
         if self.adaptiveDepth:
             self.maxDepth = self._getAdaptiveDepth(state)
-        
-        _, action = self._alphaBeta(state, self.maxDepth, -sys.maxsize, sys.maxsize, True)
+
+        value, action = self._searchRoot(state, self.maxDepth)
+        self.completedDepth, self.rootValue = self.maxDepth, value
         return action
 
 
+def createEngineAgent(player, timeLimit=7, ponder=False, patternEvaluation=PATTERN_EVALUATION):
+    # The agent as deployed, shared by this script (ai1.py / ai2.py) and AgentServer.
+    # patternEvaluation uses pattern.weights, when present, instead of counting material.
+    agentDirectory = os.path.dirname(os.path.abspath(__file__))
+    evaluator = openPatternEvaluator(os.path.join(agentDirectory, "pattern.weights")) if patternEvaluation else None
+    return AlphaBetaAgent(maxDepth=49, player=player, timeLimit=timeLimit, ponder=ponder,
+                          openingBook=openOpeningBook(os.path.join(agentDirectory, "opening.book")),
+                          searchLog=openSearchLog(os.environ.get("ATAXX_SEARCH_LOG")), evaluator=evaluator,
+                          timeManager=TimeManager(softTargets=ponder))
+
 
 if __name__ == "__main__":
     input_str = sys.stdin.read()
@@ -164,7 +494,7 @@ if __name__ == "__main__":
 
         state = AtaxxState(board=board, turn=player)
 
-        agent = AlphaBetaAgent(maxDepth=3, player=player, adaptiveDepth=True)
-        action = agent.getAction(state=state)
+        agent = createEngineAgent(player)
+        action = agent.getAction(state=state, startTime=PROCESS_START)
 
         sys.stdout.write("{} {} {} {}" .format(*action))
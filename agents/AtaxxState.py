@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+# Bitboard Ataxx engine shared by every agent.
+# Square (i, j) is bit i * 7 + j of a 49-bit integer, one integer per player.
+import random
+
+BOARD_SIZE = 7
+NUM_SQUARES = BOARD_SIZE * BOARD_SIZE
+FULL_MASK = (1 << NUM_SQUARES) - 1
+
+SQUARE_COORDS = [(sq // BOARD_SIZE, sq % BOARD_SIZE) for sq in range(NUM_SQUARES)]
+
+
+def _columnMask(column):
+    mask = 0
+    for i in range(BOARD_SIZE):
+        mask |= 1 << (i * BOARD_SIZE + column)
+    return mask
+
+
+NOT_COL_0 = FULL_MASK ^ _columnMask(0)
+NOT_COL_01 = NOT_COL_0 ^ _columnMask(1)
+NOT_COL_6 = FULL_MASK ^ _columnMask(6)
+NOT_COL_56 = NOT_COL_6 ^ _columnMask(5)
+
+
+def _ringMask(sq, distance):
+    i, j = SQUARE_COORDS[sq]
+    mask = 0
+    for x in range(max(0, i - distance), min(BOARD_SIZE, i + distance + 1)):
+        for y in range(max(0, j - distance), min(BOARD_SIZE, j + distance + 1)):
+            if max(abs(x - i), abs(y - j)) == distance:
+                mask |= 1 << (x * BOARD_SIZE + y)
+    return mask
+
+
+NEIGHBOR_MASKS = [_ringMask(sq, 1) for sq in range(NUM_SQUARES)]
+JUMP_MASKS = [_ringMask(sq, 2) for sq in range(NUM_SQUARES)]
+
+# ACTIONS[src][dst] is the (x, y, i, j) tuple the referee expects.
+ACTIONS = [[SQUARE_COORDS[src] + SQUARE_COORDS[dst] for dst in range(NUM_SQUARES)]
+           for src in range(NUM_SQUARES)]
+
+# Actions packed into 16 bits as src * NUM_SQUARES + dst, for the MCTS tree
+# arrays, the transposition table and the opening book.
+NO_ACTION = 0xFFFF
+
+
+def packAction(action):
+    x, y, i, j = action
+    return (x * BOARD_SIZE + y) * NUM_SQUARES + i * BOARD_SIZE + j
+
+
+def unpackAction(packedAction):
+    if packedAction == NO_ACTION:
+        return None
+    return ACTIONS[packedAction // NUM_SQUARES][packedAction % NUM_SQUARES]
+
+# Zobrist keys for (player, square) and for player 2 to move. The seed is fixed
+# so hashes stay valid across processes and in files written to disk.
+_zobristRandom = random.Random(20201120)
+ZOBRIST_KEYS = [None] + [[_zobristRandom.getrandbits(64) for _ in range(NUM_SQUARES)] for _ in (1, 2)]
+ZOBRIST_FLIP_KEYS = [ZOBRIST_KEYS[1][sq] ^ ZOBRIST_KEYS[2][sq] for sq in range(NUM_SQUARES)]
+ZOBRIST_TURN = _zobristRandom.getrandbits(64)
+
+
+def popcount(bitboard):
+    return bin(bitboard).count("1")
+
+
+def squares(bitboard):
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+def dilate(bitboard):
+    row = bitboard | ((bitboard << 1) & NOT_COL_0) | ((bitboard >> 1) & NOT_COL_6)
+    return (row | (row << BOARD_SIZE) | (row >> BOARD_SIZE)) & FULL_MASK
+
+
+def dilate2(bitboard):
+    row = (bitboard | ((bitboard << 1) & NOT_COL_0) | ((bitboard << 2) & NOT_COL_01)
+           | ((bitboard >> 1) & NOT_COL_6) | ((bitboard >> 2) & NOT_COL_56))
+    return (row | (row << BOARD_SIZE) | (row << 2 * BOARD_SIZE)
+            | (row >> BOARD_SIZE) | (row >> 2 * BOARD_SIZE)) & FULL_MASK
+
+
+def zobristHash(pieces, turn):
+    key = ZOBRIST_TURN if turn == 2 else 0
+    for player in (1, 2):
+        for sq in squares(pieces[player]):
+            key ^= ZOBRIST_KEYS[player][sq]
+    return key
+
+
+def _flipHash(flips):
+    key = 0
+    for sq in squares(flips):
+        key ^= ZOBRIST_FLIP_KEYS[sq]
+    return key
+
+
+def initialBoard():
+    board = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    board[0][0] = board[BOARD_SIZE - 1][BOARD_SIZE - 1] = 1
+    board[0][BOARD_SIZE - 1] = board[BOARD_SIZE - 1][0] = 2
+    return board
+
+
+def boardToBitboards(board):
+    pieces = [None, 0, 0]
+    for i in range(BOARD_SIZE):
+        for j in range(BOARD_SIZE):
+            if board[i][j]:
+                pieces[board[i][j]] |= 1 << (i * BOARD_SIZE + j)
+    return pieces
+
+
+class AtaxxState(object):
+    def __init__(self, board, turn):
+        self.pieces = boardToBitboards(board)
+        self.turn = turn
+        self.counts = [None, popcount(self.pieces[1]), popcount(self.pieces[2])]
+        self.hash = zobristHash(self.pieces, turn)
+        self._possibleActions = None
+
+    @classmethod
+    def fromBitboards(cls, pieces, turn, counts=None, hash=None):
+        state = cls.__new__(cls)
+        state.pieces = pieces
+        state.turn = turn
+        state.counts = counts if counts is not None else [None, popcount(pieces[1]), popcount(pieces[2])]
+        state.hash = hash if hash is not None else zobristHash(pieces, turn)
+        state._possibleActions = None
+        return state
+
+    def copy(self):
+        return AtaxxState.fromBitboards(list(self.pieces), self.turn, list(self.counts), self.hash)
+
+    @property
+    def board(self):
+        board = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        for player in (1, 2):
+            for sq in squares(self.pieces[player]):
+                i, j = SQUARE_COORDS[sq]
+                board[i][j] = player
+        return board
+
+    def empty(self):
+        return FULL_MASK ^ (self.pieces[1] | self.pieces[2])
+
+    @property
+    def possibleActions(self):
+        # Generated on first access only; most search leaves never ask for it.
+        if self._possibleActions is None:
+            self._updatePossibleActions()
+        return self._possibleActions
+
+    def _updatePossibleActions(self):
+        self._possibleActions = list(self.iterActions())
+
+    def iterActions(self):
+        if self._possibleActions is not None:
+            for action in self._possibleActions:
+                yield action
+            return
+
+        own = self.pieces[self.turn]
+        empty = self.empty()
+
+        # One clone per destination, taken from the lowest adjacent source.
+        for dst in squares(dilate(own) & empty):
+            sources = NEIGHBOR_MASKS[dst] & own
+            yield ACTIONS[(sources & -sources).bit_length() - 1][dst]
+
+        for dst in squares(dilate2(own) & empty):
+            for src in squares(JUMP_MASKS[dst] & own):
+                yield ACTIONS[src][dst]
+
+    def hasAnyMove(self):
+        if self._possibleActions is not None:
+            return len(self._possibleActions) > 0
+        return dilate2(self.pieces[self.turn]) & self.empty() != 0
+
+    def step(self, action):
+        x, y, i, j = action
+        src, dst = x * BOARD_SIZE + y, i * BOARD_SIZE + j
+        turn = self.turn
+
+        own, opp = self.pieces[turn], self.pieces[3 - turn]
+        flips = NEIGHBOR_MASKS[dst] & opp
+        numFlips = popcount(flips)
+        own |= flips | (1 << dst)
+        opp ^= flips
+        hash = self.hash ^ ZOBRIST_TURN ^ ZOBRIST_KEYS[turn][dst] ^ _flipHash(flips)
+        counts = list(self.counts)
+        counts[turn] += numFlips + 1
+        counts[3 - turn] -= numFlips
+        if abs(x - i) == 2 or abs(y - j) == 2:
+            own ^= 1 << src
+            hash ^= ZOBRIST_KEYS[turn][src]
+            counts[turn] -= 1
+
+        pieces = [None, 0, 0]
+        pieces[turn], pieces[3 - turn] = own, opp
+        return AtaxxState.fromBitboards(pieces, 3 - turn, counts, hash)
+
+    def make(self, action):
+        # Plays the action in place and returns the undo record: the bitboards,
+        # counts, hash and move list from before, which unmake puts straight back.
+        x, y, i, j = action
+        src, dst = x * BOARD_SIZE + y, i * BOARD_SIZE + j
+        turn, pieces, counts = self.turn, self.pieces, self.counts
+        own, opp, hash = pieces[turn], pieces[3 - turn], self.hash
+        undoRecord = (own, opp, counts[turn], counts[3 - turn], hash, self._possibleActions)
+
+        flips = NEIGHBOR_MASKS[dst] & opp
+        numFlips = popcount(flips)
+        own |= flips | (1 << dst)
+        hash ^= ZOBRIST_TURN ^ ZOBRIST_KEYS[turn][dst] ^ _flipHash(flips)
+        counts[turn] += numFlips + 1
+        counts[3 - turn] -= numFlips
+        if abs(x - i) == 2 or abs(y - j) == 2:
+            own ^= 1 << src
+            hash ^= ZOBRIST_KEYS[turn][src]
+            counts[turn] -= 1
+        pieces[turn], pieces[3 - turn] = own, opp ^ flips
+
+        self.hash = hash
+        self.turn = 3 - turn
+        self._possibleActions = None
+        return undoRecord
+
+    def unmake(self, undoRecord):
+        turn = 3 - self.turn
+        own, opp, ownCount, oppCount, self.hash, self._possibleActions = undoRecord
+        self.pieces[turn], self.pieces[3 - turn] = own, opp
+        self.counts[turn], self.counts[3 - turn] = ownCount, oppCount
+        self.turn = turn
+
+    def isTerminal(self):
+        return not self.hasAnyMove()
+
+    def score(self, player):
+        return self.counts[player]
+
+    def winner(self):
+        # Empty squares go to the side not to move, as the referee fills them on a block.
+        playerScores = [None, 0, 0]
+        playerScores[self.turn] = self.score(self.turn)
+        playerScores[3 - self.turn] = NUM_SQUARES - playerScores[self.turn]
+        return 1 if playerScores[1] > playerScores[2] else 2
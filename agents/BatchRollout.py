@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Plays many independent random games in lockstep with NumPy. Boards are (N, 49)
+# int8 rows (0 empty, 1/2 player); move generation is a product with the
+# neighbour kernel for clones and a gather over precomputed (src, dst) pairs for jumps.
+import numpy as np
+
+from AtaxxState import AtaxxState, NUM_SQUARES, NEIGHBOR_MASKS, JUMP_MASKS, squares
+from MCTSTree import DRAW
+
+
+def _kernelMatrix(masks):
+    kernel = np.zeros((NUM_SQUARES, NUM_SQUARES), dtype=np.int8)
+    for sq in range(NUM_SQUARES):
+        for other in squares(masks[sq]):
+            kernel[sq, other] = 1
+    return kernel
+
+
+NEIGHBOR_KERNEL = _kernelMatrix(NEIGHBOR_MASKS).astype(np.float32)
+NEIGHBOR_FLAGS = NEIGHBOR_KERNEL.astype(bool)
+JUMP_PAIRS = np.array([(src, dst) for dst in range(NUM_SQUARES) for src in squares(JUMP_MASKS[dst])],
+                      dtype=np.intp)
+JUMP_SOURCES, JUMP_DESTINATIONS = JUMP_PAIRS[:, 0], JUMP_PAIRS[:, 1]
+NUM_MOVE_SLOTS = NUM_SQUARES + len(JUMP_PAIRS)
+
+
+def statesToBoards(states):
+    boards = np.zeros((len(states), NUM_SQUARES), dtype=np.int8)
+    for row, state in enumerate(states):
+        for player in (1, 2):
+            bits = np.frombuffer(state.pieces[player].to_bytes(7, "little"), dtype=np.uint8)
+            boards[row][np.unpackbits(bits, bitorder="little")[:NUM_SQUARES].astype(bool)] = player
+    return boards
+
+
+def boardsToStates(boards, turns):
+    states = []
+    for board, turn in zip(boards, turns):
+        pieces = [None] + [int.from_bytes(np.packbits(board == player, bitorder="little").tobytes(), "little")
+                           for player in (1, 2)]
+        states.append(AtaxxState.fromBitboards(pieces, int(turn)))
+    return states
+
+
+class BatchRollout(object):
+    def __init__(self, randomSeed=None, evaluator=None):
+        self.random = np.random.RandomState(randomSeed)
+        self.evaluator = evaluator
+        self.plies = 0
+
+    def legalMoves(self, boards, turns):
+        # Slot k < 49 is a clone onto square k; slot 49 + p is jump pair p.
+        own = boards == turns[:, None]
+        empty = boards == 0
+        cloneTargets = empty & (own.astype(np.float32) @ NEIGHBOR_KERNEL > 0)
+        jumps = own[:, JUMP_SOURCES] & empty[:, JUMP_DESTINATIONS]
+        return np.concatenate([cloneTargets, jumps], axis=1)
+
+    def run(self, states, maxPlies):
+        # Returns the winner of each game (1 or 2). A game still going after maxPlies plies
+        # is scored like MCTSAgent._cutoffWinner: the side ahead on material, or by the
+        # evaluator when given, and DRAW when level.
+        boards = statesToBoards(states)
+        turns = np.array([state.turn for state in states], dtype=np.int8)
+        winners = np.zeros(len(states), dtype=np.int8)
+        active = np.arange(len(states))
+
+        for ply in range(maxPlies + 1):
+            if len(active) == 0:
+                break
+            activeBoards, activeTurns = boards[active], turns[active]
+            moves = self.legalMoves(activeBoards, activeTurns)
+
+            # A side with no move loses the empty squares to the opponent.
+            blocked = ~moves.any(axis=1)
+            if blocked.any():
+                blockedRows = active[blocked]
+                moverScores = (boards[blockedRows] == turns[blockedRows, None]).sum(axis=1)
+                winners[blockedRows] = np.where(2 * moverScores > NUM_SQUARES, turns[blockedRows],
+                                                3 - turns[blockedRows])
+                active, activeBoards, activeTurns, moves = \
+                    active[~blocked], activeBoards[~blocked], activeTurns[~blocked], moves[~blocked]
+                if len(active) == 0:
+                    break
+            if ply == maxPlies:
+                break
+
+            # Uniform choice among legal slots: the first slot whose running count passes a random rank.
+            runningCounts = np.cumsum(moves, axis=1, dtype=np.int16)
+            ranks = (self.random.random_sample(len(active)) * runningCounts[:, -1]).astype(np.int16)
+            choices = (runningCounts > ranks[:, None]).argmax(axis=1)
+
+            rows = np.arange(len(active))
+            isJump = choices >= NUM_SQUARES
+            jumpIndex = np.where(isJump, choices - NUM_SQUARES, 0)
+            destinations = np.where(isJump, JUMP_DESTINATIONS[jumpIndex], choices)
+            activeBoards[rows[isJump], JUMP_SOURCES[jumpIndex[isJump]]] = 0
+            activeBoards[rows, destinations] = activeTurns
+
+            infected = NEIGHBOR_FLAGS[destinations] & (activeBoards == (3 - activeTurns)[:, None])
+            activeBoards[infected] = np.repeat(activeTurns, infected.sum(axis=1))
+
+            boards[active] = activeBoards
+            turns[active] = 3 - activeTurns
+            self.plies += len(active)
+
+        if len(active):
+            if self.evaluator is not None:
+                values = np.array([self.evaluator.evaluate(state, 1)
+                                   for state in boardsToStates(boards[active], turns[active])])
+            else:
+                values = (boards[active] == 1).sum(axis=1) - (boards[active] == 2).sum(axis=1)
+            winners[active] = np.where(values > 0, 1, np.where(values < 0, 2, DRAW))
+        return [int(winner) for winner in winners]
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# Engine and agent benchmarks. Perft counts from fixed positions double as a
+# move-generation oracle (the expected counts come from the original
+# list-of-lists AtaxxState); the rest measures throughput. Results are one JSON
+# document so runs can be diffed or compared with --baseline.
+import sys
+import json
+import time
+import random
+import argparse
+
+from AtaxxState import AtaxxState
+
+# name: (rows, turn, {depth: expected perft count})
+POSITIONS = {
+    "start": (["1000002", "0000000", "0000000", "0000000", "0000000", "0000000", "2000001"], 1,
+              {1: 16, 2: 256, 3: 6460, 4: 155888}),
+    "opening": (["1000000", "0000000", "0000000", "0000200", "0000020", "0020020", "0200020"], 1,
+                {1: 8, 2: 574, 3: 9224, 4: 642354}),
+    "midgame": (["0000110", "0000001", "0000001", "2002000", "0000220", "0000222", "0000020"], 1,
+                {1: 30, 2: 2207, 3: 85204, 4: 5812185}),
+    "lateMidgame": (["2000000", "0001100", "0000200", "0022200", "0000020", "0000100", "0001111"], 1,
+                    {1: 59, 2: 3629, 3: 227649, 4: 13223610}),
+    "endgame": (["0222210", "1022212", "1020202", "1101112", "2211112", "0211222", "2222202"], 1,
+                {1: 42, 2: 1529, 3: 57512, 4: 2136499, 5: 75747863}),
+}
+
+
+def positionState(name):
+    rows, turn, _ = POSITIONS[name]
+    return AtaxxState([[int(cell) for cell in row] for row in rows], turn)
+
+
+def perft(state, depth):
+    # Leaf count at exactly depth plies; a side with no move ends the game, so it adds nothing.
+    if depth == 1:
+        return len(state.possibleActions)
+    nodes = 0
+    for action in state.iterActions():
+        undoRecord = state.make(action)
+        nodes += perft(state, depth - 1)
+        state.unmake(undoRecord)
+    return nodes
+
+
+def runPerft(maxDepth):
+    results = []
+    for name, (_, _, expected) in POSITIONS.items():
+        for depth in sorted(expected):
+            if depth > maxDepth:
+                continue
+            state = positionState(name)
+            startTime = time.time()
+            nodes = perft(state, depth)
+            seconds = time.time() - startTime
+            results.append({"position": name, "depth": depth, "nodes": nodes, "expected": expected[depth],
+                            "ok": nodes == expected[depth], "seconds": seconds,
+                            "nodesPerSecond": nodes / seconds if seconds else 0.0})
+    return results
+
+
+def _timed(seconds, body):
+    # Calls body() until the time is up; body returns how many units of work it did.
+    count, startTime = 0, time.time()
+    while time.time() - startTime < seconds:
+        count += body()
+    return count / (time.time() - startTime)
+
+
+def benchMoveGeneration(seconds):
+    states = [positionState(name) for name in POSITIONS]
+    calls = [0]
+
+    def body():
+        generated = 0
+        for state in states:
+            fresh = AtaxxState.fromBitboards(list(state.pieces), state.turn)
+            fresh._updatePossibleActions()
+            generated += len(fresh.possibleActions)
+        calls[0] += len(states)
+        return generated
+
+    startTime = time.time()
+    movesPerSecond = _timed(seconds, body)
+    return {"movesPerSecond": movesPerSecond, "callsPerSecond": calls[0] / (time.time() - startTime)}
+
+
+def _randomLines(numLines, seed):
+    lineRandom = random.Random(seed)
+    lines = []
+    for name in POSITIONS:
+        for _ in range(numLines):
+            state, actions = positionState(name), []
+            for _ in range(8):
+                if state.isTerminal():
+                    break
+                action = lineRandom.choice(state.possibleActions)
+                actions.append(action)
+                state = state.step(action)
+            lines.append((positionState(name), actions))
+    return lines
+
+
+def benchStep(seconds):
+    lines = _randomLines(4, seed=13)
+
+    def stepBody():
+        for state, actions in lines:
+            for action in actions:
+                state = state.step(action)
+        return sum(len(actions) for _, actions in lines)
+
+    def makeBody():
+        for state, actions in lines:
+            undoRecords = [state.make(action) for action in actions]
+            for undoRecord in reversed(undoRecords):
+                state.unmake(undoRecord)
+        return sum(len(actions) for _, actions in lines)
+
+    return {"stepsPerSecond": _timed(seconds, stepBody), "makeUnmakePerSecond": _timed(seconds, makeBody)}
+
+
+def benchAlphaBeta(moveTime):
+    from AlphaBetaAgent import AlphaBetaAgent
+
+    nodes, seconds, depths = 0, 0.0, {}
+    for name in POSITIONS:
+        state = positionState(name)
+        agent = AlphaBetaAgent(maxDepth=49, player=state.turn, timeLimit=moveTime)
+        startTime = time.time()
+        agent.getAction(state)
+        seconds += time.time() - startTime
+        nodes += agent.nodes
+        depths[name] = agent.completedDepth
+    return {"nodesPerSecond": nodes / seconds, "completedDepth": depths}
+
+
+def benchLazySmp(depth, workerCounts, moveTime):
+    # By number of Lazy SMP workers: the time to complete `depth` on every position
+    # (speedup is relative to the first count) and the mean depth completed in
+    # moveTime per position. Pool start-up is kept out of the timing. "workers" is
+    # the count actually used, which AlphaBetaAgent caps at the number of cores.
+    from AlphaBetaAgent import AlphaBetaAgent
+
+    results = []
+    for numWorkers in workerCounts:
+        nodes, seconds = 0, 0.0
+        agent = AlphaBetaAgent(maxDepth=1, player=1, timeLimit=float("inf"), endgameThreshold=0,
+                               numWorkers=numWorkers)
+        agent.getAction(positionState("start"))
+        agent.maxDepth = depth
+        for name in POSITIONS:
+            state = positionState(name)
+            agent.player = state.turn
+            agent.transpositionTable.clear()
+            startTime = time.time()
+            agent.getAction(state)
+            seconds += time.time() - startTime
+            nodes += agent.nodes + agent.helperNodes
+
+        agent.maxDepth, agent.timeLimit = 49, moveTime
+        timedNodes, timedSeconds, depths = 0, 0.0, 0
+        for name in POSITIONS:
+            state = positionState(name)
+            agent.player = state.turn
+            agent.transpositionTable.clear()
+            startTime = time.time()
+            agent.getAction(state)
+            timedSeconds += time.time() - startTime
+            timedNodes += agent.nodes + agent.helperNodes
+            depths += agent.completedDepth
+        agent.close()
+        results.append({"workers": agent.numWorkers, "seconds": seconds, "nodesPerSecond": nodes / seconds,
+                        "speedup": results[0]["seconds"] / seconds if results else 1.0,
+                        "timedDepth": depths / float(len(POSITIONS)),
+                        "timedNodesPerSecond": timedNodes / timedSeconds})
+    return results
+
+
+def benchMCTS(moveTime):
+    from MCTSAgent import MCTSAgent
+
+    iterations, seconds = 0, 0.0
+    for name in POSITIONS:
+        state = positionState(name)
+        agent = MCTSAgent(timeLimit=moveTime, player=state.turn, randomSeed=1)
+        startTime = time.time()
+        agent.getAction(state)
+        seconds += time.time() - startTime
+        iterations += agent.iterations
+    return {"rolloutsPerSecond": iterations / seconds}
+
+
+def runBenchmarks(perftDepth, seconds, agentTime, smpDepth=None, smpWorkers=()):
+    results = {
+        "python": sys.version.split()[0],
+        "perft": runPerft(perftDepth),
+        "moveGeneration": benchMoveGeneration(seconds),
+        "step": benchStep(seconds),
+        "alphaBeta": benchAlphaBeta(agentTime),
+        "mcts": benchMCTS(agentTime),
+    }
+    if smpWorkers:
+        results["lazySmp"] = benchLazySmp(smpDepth, smpWorkers, agentTime)
+    return results
+
+
+def compare(results, baseline, prefix=""):
+    # Prints current / baseline for every numeric throughput figure found in both.
+    for key, value in results.items():
+        if key not in baseline:
+            continue
+        if isinstance(value, dict):
+            compare(value, baseline[key], prefix + key + ".")
+        elif isinstance(value, float) and baseline[key]:
+            print("{:<40} {:>14.1f} {:>14.1f} {:>7.2f}x".format(prefix + key, value, baseline[key], value / baseline[key]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perft and throughput benchmarks for AtaxxState and the agents.")
+    parser.add_argument("--perft-depth", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=1.0, help="duration of each micro benchmark")
+    parser.add_argument("--agent-time", type=float, default=1.0, help="search time per position for the agents")
+    parser.add_argument("--smp-workers", type=lambda text: [int(count) for count in text.split(",")], default=[],
+                        help="comma-separated Lazy SMP worker counts to time alpha-beta with, e.g. 1,2,4; "
+                             "the depth reached uses --agent-time")
+    parser.add_argument("--smp-depth", type=int, default=5, help="search depth for --smp-workers")
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--baseline", help="earlier --json output to compare against")
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.perft_depth, args.seconds, args.agent_time, args.smp_depth, args.smp_workers)
+    if args.json:
+        with open(args.json, "w") as jsonFile:
+            json.dump(results, jsonFile, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    if args.baseline:
+        with open(args.baseline) as baselineFile:
+            compare(results, json.load(baselineFile))
+
+    failures = [result for result in results["perft"] if not result["ok"]]
+    for failure in failures:
+        sys.stderr.write("perft mismatch: {position} depth {depth}: {nodes} != {expected}\n".format(**failure))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Exact endgame search for positions with few empty squares. Values are final
+# piece differences from the side to move, counting the referee's rule that a
+# side with no move loses every empty square to the opponent.
+#
+# Jumps do not fill squares, so a line can outlast any depth. Each depth is
+# therefore searched twice, once scoring horizon leaves as the worst possible
+# result for the root player and once as the best. The two root values bound
+# the true result: equal bounds give the exact score, a positive lower bound a
+# proven win, a negative upper bound a proven loss. Subtrees that never reach
+# the horizon are exact in both passes and cached as proven, independent of depth.
+import time
+import random
+
+from AtaxxState import BOARD_SIZE, NUM_SQUARES, NEIGHBOR_MASKS, popcount
+from TranspositionTable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+PROVEN_DEPTH = 255
+INFINITY = NUM_SQUARES + 1
+PESSIMISTIC, OPTIMISTIC = 0, 1
+# Assumed growth from one depth to the next until two depths have been timed.
+DEPTH_GROWTH = 4.0
+# Unproven entries are stored under hash ^ MODE_KEYS[mode] so the two passes never mix.
+_modeRandom = random.Random(4242)
+MODE_KEYS = [_modeRandom.getrandbits(64), _modeRandom.getrandbits(64)]
+
+
+class SolverTimeout(Exception):
+    pass
+
+
+class EndgameSolver(object):
+    def __init__(self, emptyThreshold=3, ttMemoryBudget=8 * 1024 * 1024, maxExtraPlies=8):
+        self.emptyThreshold = emptyThreshold
+        self.maxExtraPlies = maxExtraPlies
+        self.transpositionTable = TranspositionTable(ttMemoryBudget)
+        self.nodes = 0
+
+        self._deadline = None
+        self._horizonHits = 0
+        self._modeKey = 0
+        self._horizonValues = [None, 0, 0]
+
+    def isApplicable(self, state):
+        return popcount(state.empty()) <= self.emptyThreshold
+
+    def _finalScore(self, state):
+        # Side to move has no move: it keeps its pieces, the opponent gets the rest.
+        return 2 * state.score(state.turn) - NUM_SQUARES
+
+    def _orderedActions(self, state, firstAction):
+        if firstAction is not None:
+            yield firstAction
+        opp = state.pieces[3 - state.turn]
+        scoredActions = []
+        for action in state.iterActions():
+            if action == firstAction:
+                continue
+            x, y, i, j = action
+            score = 2 * popcount(NEIGHBOR_MASKS[i * BOARD_SIZE + j] & opp)
+            if abs(x - i) <= 1 and abs(y - j) <= 1:
+                score += 1
+            scoredActions.append((score, action))
+        scoredActions.sort(key=lambda scoredAction: scoredAction[0], reverse=True)
+        for _, action in scoredActions:
+            yield action
+
+    def _negamax(self, state, depth, alpha, beta):
+        self.nodes += 1
+        if self._deadline is not None and self.nodes & 1023 == 0 and time.time() >= self._deadline:
+            raise SolverTimeout()
+        if not state.hasAnyMove():
+            return self._finalScore(state), None
+        if depth == 0:
+            self._horizonHits += 1
+            return self._horizonValues[state.turn], None
+
+        table = self.transpositionTable
+        alphaOrig, betaOrig, ttAction = alpha, beta, None
+        entry = table.probe(state.hash)
+        if entry is None:
+            entry = table.probe(state.hash ^ self._modeKey)
+        if entry is not None:
+            _, entryDepth, flag, entryValue, ttAction = entry
+            if entryDepth >= depth:
+                # A cutoff on an unproven entry leaves this node unproven too.
+                cutoffHits = 0 if entryDepth == PROVEN_DEPTH else 1
+                if flag == EXACT:
+                    self._horizonHits += cutoffHits
+                    return entryValue, ttAction
+                elif flag == LOWER_BOUND:
+                    alpha = max(alpha, entryValue)
+                else:
+                    beta = min(beta, entryValue)
+                if alpha >= beta:
+                    self._horizonHits += cutoffHits
+                    return entryValue, ttAction
+
+        horizonHits = self._horizonHits
+        value, chosenAction = -INFINITY, None
+        for action in self._orderedActions(state, ttAction):
+            undoRecord = state.make(action)
+            childValue, _ = self._negamax(state, depth - 1, -beta, -alpha)
+            state.unmake(undoRecord)
+            if -childValue > value:
+                value, chosenAction = -childValue, action
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if value <= alphaOrig:
+            flag = UPPER_BOUND
+        elif value >= betaOrig:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        if self._horizonHits == horizonHits:
+            table.store(state.hash, PROVEN_DEPTH, flag, value, chosenAction)
+        else:
+            table.store(state.hash ^ self._modeKey, depth, flag, value, chosenAction)
+        return value, chosenAction
+
+    def _search(self, state, depth, mode):
+        rootPlayer = state.turn
+        worst, best = -NUM_SQUARES, NUM_SQUARES
+        horizonForRoot = worst if mode == PESSIMISTIC else best
+        self._horizonValues = [None, 0, 0]
+        self._horizonValues[rootPlayer] = horizonForRoot
+        self._horizonValues[3 - rootPlayer] = -horizonForRoot
+        self._modeKey = MODE_KEYS[mode]
+        self._horizonHits = 0
+        return self._negamax(state.copy(), depth, -INFINITY, INFINITY)
+
+    def solve(self, state, timeLimit):
+        # Returns (action, lowerBound, upperBound) for the side to move from the
+        # deepest completed depth; action comes from the pessimistic pass, so it
+        # guarantees at least lowerBound. action is None if nothing finished in time.
+        self.nodes = 0
+        self._deadline = time.time() + timeLimit
+        empties = popcount(state.empty())
+        bestAction, lowerBound, upperBound = None, -NUM_SQUARES, NUM_SQUARES
+        depthSeconds = []
+        try:
+            for depth in range(max(empties, 1), 2 * empties + self.maxExtraPlies + 1):
+                # A depth that would not finish in time is not started: the remaining
+                # time is worth more to the caller's search than to a partial proof.
+                if depthSeconds:
+                    growth = depthSeconds[-1] / depthSeconds[-2] if len(depthSeconds) > 1 and depthSeconds[-2] \
+                        else DEPTH_GROWTH
+                    if time.time() + depthSeconds[-1] * growth >= self._deadline:
+                        break
+                depthStart = time.time()
+                lower, action = self._search(state, depth, PESSIMISTIC)
+                if self._horizonHits == 0:
+                    return action, lower, lower
+                bestAction, lowerBound = action, lower
+                if lower > 0:
+                    break
+                upperBound, _ = self._search(state, depth, OPTIMISTIC)
+                if lowerBound == upperBound or upperBound < 0:
+                    break
+                depthSeconds.append(time.time() - depthStart)
+        except SolverTimeout:
+            pass
+        finally:
+            self._deadline = None
+        return bestAction, lowerBound, upperBound
+
+    def provenAction(self, state, timeLimit):
+        # The move to play if, within timeLimit seconds, the exact result or a win is
+        # proven; None otherwise, leaving the rest of the clock to the agent's search.
+        if timeLimit <= 0 or not self.isApplicable(state):
+            return None
+        action, lowerBound, upperBound = self.solve(state, timeLimit)
+        if action is not None and (lowerBound == upperBound or lowerBound > 0):
+            return action
+        return None
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# Compact binary game records, read back as a stream of games or positions.
+#
+# File layout (little endian): "ATXR" | version u16, then games back to back:
+#   header   blockLength u32 | numMoves u16 | result u8   (blockLength counts what follows)
+#   agents   two names, each length u8 | utf-8 bytes
+#   times    numMoves x u16 milliseconds
+#   moves    clone: dst (1 byte); jump: 0x40 | dst, index into JUMP_OFFSETS (2 bytes)
+# Every game starts from the initial board. A clone is stored by destination only,
+# since every clone onto a square gives the same position; it is read back from
+# the lowest adjacent source, as AtaxxState orders its moves.
+import sys
+import struct
+import argparse
+from collections import namedtuple
+
+from AtaxxState import AtaxxState, BOARD_SIZE, NEIGHBOR_MASKS, SQUARE_COORDS, initialBoard
+
+MAGIC = b"ATXR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+GAME_HEADER = struct.Struct("<IHB")
+JUMP_FLAG = 0x40
+SQUARE_MASK = 0x3F
+JUMP_OFFSETS = [(di, dj) for di in range(-2, 3) for dj in range(-2, 3) if max(abs(di), abs(dj)) == 2]
+MAX_MILLIS = 0xFFFF
+# Agent name stored for a side the recording engine does not know.
+OPPONENT_NAME = "?"
+
+# result: winner 1 or 2, or 0 for a draw or an unfinished game.
+# moveTimes: seconds per move; None (e.g. a random opening move) is stored as 0.
+GameRecord = namedtuple("GameRecord", ["agents", "result", "actions", "moveTimes"])
+
+
+def encodeAction(action):
+    x, y, i, j = action
+    dst = i * BOARD_SIZE + j
+    if abs(x - i) <= 1 and abs(y - j) <= 1:
+        return bytes([dst])
+    return bytes([JUMP_FLAG | dst, JUMP_OFFSETS.index((x - i, y - j))])
+
+
+def _decodeMoves(data, offset, numMoves):
+    # Replays the moves from the initial board; yields (state, action) before each
+    # move and finally (state, None).
+    state = AtaxxState(initialBoard(), 1)
+    for _ in range(numMoves):
+        code = data[offset]
+        i, j = SQUARE_COORDS[code & SQUARE_MASK]
+        if code & JUMP_FLAG:
+            di, dj = JUMP_OFFSETS[data[offset + 1]]
+            x, y = i + di, j + dj
+            offset += 2
+        else:
+            sources = NEIGHBOR_MASKS[code & SQUARE_MASK] & state.pieces[state.turn]
+            x, y = SQUARE_COORDS[(sources & -sources).bit_length() - 1]
+            offset += 1
+        action = (x, y, i, j)
+        yield state, action
+        state = state.step(action)
+    yield state, None
+
+
+def encodeGame(record):
+    names = b"".join(bytes([len(encoded)]) + encoded
+                     for encoded in (name.encode("utf-8")[:255] for name in record.agents))
+    moves = b"".join(encodeAction(action) for action in record.actions)
+    millis = [0 if seconds is None else min(MAX_MILLIS, int(round(seconds * 1000))) for seconds in record.moveTimes]
+    times = struct.pack("<{}H".format(len(millis)), *millis)
+    block = names + times + moves
+    return GAME_HEADER.pack(len(block), len(record.actions), record.result) + block
+
+
+class GameWriter(object):
+    def __init__(self, path):
+        # Appends to an existing record file, or starts a new one.
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, record):
+        self._file.write(encodeGame(record))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excInfo):
+        self.close()
+
+
+class GameRecorder(object):
+    # Records the game of one engine that is only shown the positions it moves in,
+    # as AgentServer is: each opponent move is recovered as the move that turns the
+    # position after ours into the next one we are shown. A game whose positions
+    # do not follow one another is dropped. The result is known only if our move
+    # ended the game; otherwise the game is stored as unfinished.
+    def __init__(self, path, agentName, player):
+        self.path, self.player = path, player
+        agents = [OPPONENT_NAME, OPPONENT_NAME]
+        agents[player - 1] = agentName
+        self.agents = tuple(agents)
+        self._startGame()
+
+    def _startGame(self):
+        self._state, self._actions, self._moveTimes, self._broken = AtaxxState(initialBoard(), 1), [], [], False
+
+    def observe(self, state):
+        # state: a position this engine is to move in.
+        if self._broken or (self._state.turn == state.turn and self._state.pieces == state.pieces):
+            return
+        if self._state.turn != self.player:
+            for action in self._state.possibleActions:
+                child = self._state.step(action)
+                if child.turn == state.turn and child.pieces == state.pieces:
+                    self._actions.append(action)
+                    self._moveTimes.append(None)
+                    self._state = child
+                    return
+        self._broken = True
+
+    def played(self, action, seconds):
+        if not self._broken:
+            self._actions.append(action)
+            self._moveTimes.append(seconds)
+            self._state = self._state.step(action)
+
+    def finish(self):
+        # Appends the game so far, if any, and starts a new one.
+        if self._actions and not self._broken:
+            result = self._state.winner() if self._state.isTerminal() else 0
+            with GameWriter(self.path) as writer:
+                writer.write(GameRecord(self.agents, result, self._actions, self._moveTimes))
+        self._startGame()
+
+
+def openGameRecorder(path, agentName, player):
+    return GameRecorder(path, agentName, player) if path else None
+
+
+def _readBlocks(path):
+    # Yields (numMoves, result, block) one game at a time, never holding more than one game.
+    with open(path, "rb") as recordFile:
+        magic, version = FILE_HEADER.unpack(recordFile.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a game record file: {}".format(path))
+        while True:
+            header = recordFile.read(GAME_HEADER.size)
+            if len(header) < GAME_HEADER.size:
+                return
+            blockLength, numMoves, result = GAME_HEADER.unpack(header)
+            block = recordFile.read(blockLength)
+            if len(block) < blockLength:
+                raise ValueError("Truncated game record in {}".format(path))
+            yield numMoves, result, block
+
+
+def _readNames(block):
+    names, offset = [], 0
+    for _ in range(2):
+        length = block[offset]
+        names.append(block[offset + 1:offset + 1 + length].decode("utf-8"))
+        offset += 1 + length
+    return tuple(names), offset
+
+
+def readGames(path):
+    for numMoves, result, block in _readBlocks(path):
+        agents, offset = _readNames(block)
+        millis = struct.unpack_from("<{}H".format(numMoves), block, offset)
+        moves = _decodeMoves(block, offset + 2 * numMoves, numMoves)
+        actions = [action for _, action in moves if action is not None]
+        yield GameRecord(agents, result, actions, [value / 1000.0 for value in millis])
+
+
+def iterPositions(path):
+    # Every position of every game, from the initial board to the final position.
+    for numMoves, _, block in _readBlocks(path):
+        _, offset = _readNames(block)
+        for state, _ in _decodeMoves(block, offset + 2 * numMoves, numMoves):
+            yield state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a binary game record file.")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    games, plies, results = 0, 0, [0, 0, 0]
+    for record in readGames(args.path):
+        games += 1
+        plies += len(record.actions)
+        results[record.result] += 1
+    sys.stdout.write("{} games, {} plies, player 1 wins {}, player 2 wins {}, unfinished {}\n".format(
+        games, plies, results[1], results[2], results[0]))
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# Pure-Python league: plays every pair of agents against each other over a process
+# pool, from seeded random openings with colours swapped, and reports
+# win/draw/loss, Elo with confidence intervals, time per move and nodes per second.
+import os
+import csv
+import json
+import math
+import time
+import random
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from AtaxxState import AtaxxState, initialBoard
+from GameRecord import GameRecord, GameWriter
+
+AGENT_NAMES = ["Random", "AlphaBeta", "AlphaBetaPattern", "MCTS", "RuleBased"]
+MAX_PLIES = 400
+
+
+def createAgent(agentName, player, moveTime):
+    # AlphaBeta and MCTS are built as deployed, one-shot (no pondering) at moveTime;
+    # AlphaBetaPattern is the deployed AlphaBeta with pattern evaluation switched on.
+    if agentName == "Random":
+        from RandomAgent import RandomAgent
+        return RandomAgent()
+    elif agentName in ("AlphaBeta", "AlphaBetaPattern"):
+        from AlphaBetaAgent import createEngineAgent
+        return createEngineAgent(player, timeLimit=moveTime, ponder=False,
+                                 patternEvaluation=agentName == "AlphaBetaPattern")
+    elif agentName == "MCTS":
+        from MCTSAgent import createEngineAgent
+        return createEngineAgent(player, timeLimit=moveTime, ponder=False)
+    elif agentName == "RuleBased":
+        from RuleBasedAgent import RuleBasedAgent
+        return RuleBasedAgent(player=player)
+    raise ValueError("Unknown agent: {}".format(agentName))
+
+
+def searchNodes(agent):
+    # AlphaBeta counts nodes, MCTS counts iterations; the others do no search.
+    return getattr(agent, "nodes", getattr(agent, "iterations", 0))
+
+
+def openingState(seed, openingPlies):
+    # Returns the position after the random opening and the moves that led to it.
+    openingRandom = random.Random(seed)
+    state, actions = AtaxxState(initialBoard(), 1), []
+    for _ in range(openingPlies):
+        if state.isTerminal():
+            break
+        actions.append(openingRandom.choice(state.possibleActions))
+        state = state.step(actions[-1])
+    return state, actions
+
+
+def playGame(game):
+    # game: dict with agent names per player, seed, opening plies and time per move.
+    agentNames = [None, game["player1"], game["player2"]]
+    agents = [None] + [createAgent(agentNames[player], player, game["moveTime"]) for player in (1, 2)]
+    random.seed(game["seed"])
+
+    state, actions = openingState(game["seed"], game["openingPlies"])
+    actionTimes = [None] * len(actions)
+    moveTimes, nodes, moves = [None, 0.0, 0.0], [None, 0, 0], [None, 0, 0]
+    plies = 0
+    while not state.isTerminal() and plies < MAX_PLIES:
+        agent = agents[state.turn]
+        startTime = time.time()
+        action = agent.getAction(state)
+        actionTimes.append(time.time() - startTime)
+        moveTimes[state.turn] += actionTimes[-1]
+        nodes[state.turn] += searchNodes(agent)
+        moves[state.turn] += 1
+        actions.append(action)
+        state = state.step(action)
+        plies += 1
+
+    for agent in agents[1:]:
+        if hasattr(agent, "close"):
+            agent.close()
+
+    if state.isTerminal():
+        winner = state.winner()
+    elif state.score(1) != state.score(2):
+        winner = 1 if state.score(1) > state.score(2) else 2
+    else:
+        winner = 0
+
+    result = dict(game)
+    result.update({
+        "winner": winner,
+        "plies": plies,
+        "score1": state.score(1),
+        "score2": state.score(2),
+        "moves1": moves[1], "moves2": moves[2],
+        "time1": moveTimes[1], "time2": moveTimes[2],
+        "nodes1": nodes[1], "nodes2": nodes[2],
+    })
+    record = GameRecord((agentNames[1], agentNames[2]), winner, actions, actionTimes)
+    return result, record
+
+
+def scheduleGames(agentNames, gamesPerPair, openingPlies, moveTime, seed):
+    # Each opening is played twice with colours swapped, so gamesPerPair is rounded up to even.
+    games = []
+    for first, second in itertools.combinations(agentNames, 2):
+        for opening in range((gamesPerPair + 1) // 2):
+            openingSeed = seed + len(games)
+            for player1, player2 in ((first, second), (second, first)):
+                games.append({"player1": player1, "player2": player2, "seed": openingSeed,
+                              "openingPlies": openingPlies, "moveTime": moveTime})
+    return games
+
+
+def eloDifference(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+def eloInterval(wins, draws, losses, z=1.96):
+    # Elo of the score fraction and a Wilson score interval on it, which unlike the
+    # normal approximation keeps its width for sweeps (4-0 is not [2400, 2400]).
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, 0.0, 0.0
+    score = (wins + 0.5 * draws) / games
+    shrink = 1.0 + z * z / games
+    center = (score + z * z / (2.0 * games)) / shrink
+    margin = z / shrink * math.sqrt(score * (1.0 - score) / games + z * z / (4.0 * games * games))
+    return eloDifference(score), eloDifference(center - margin), eloDifference(center + margin)
+
+
+def summarize(results):
+    agents, pairs = {}, {}
+    for result in results:
+        for player in (1, 2):
+            name, opponent = result["player{}".format(player)], result["player{}".format(3 - player)]
+            outcome = "draws" if result["winner"] == 0 else ("wins" if result["winner"] == player else "losses")
+            for key, table in ((name, agents), ((name, opponent), pairs)):
+                record = table.setdefault(key, {"wins": 0, "draws": 0, "losses": 0,
+                                                "moves": 0, "time": 0.0, "nodes": 0})
+                record[outcome] += 1
+                record["moves"] += result["moves{}".format(player)]
+                record["time"] += result["time{}".format(player)]
+                record["nodes"] += result["nodes{}".format(player)]
+
+    def finish(record):
+        elo, low, high = eloInterval(record["wins"], record["draws"], record["losses"])
+        return {
+            "wins": record["wins"], "draws": record["draws"], "losses": record["losses"],
+            "elo": elo, "eloLow": low, "eloHigh": high,
+            "timePerMove": record["time"] / record["moves"] if record["moves"] else 0.0,
+            "nodesPerSecond": record["nodes"] / record["time"] if record["time"] else 0.0,
+        }
+
+    return {
+        "agents": {name: finish(record) for name, record in agents.items()},
+        "pairs": {"{} vs {}".format(*key): finish(record) for key, record in pairs.items()},
+    }
+
+
+def runLeague(agentNames, gamesPerPair, openingPlies, moveTime, seed, numWorkers, recordPath=None):
+    # recordPath, if given, gets every game appended in the GameRecord binary format.
+    games = scheduleGames(agentNames, gamesPerPair, openingPlies, moveTime, seed)
+    if numWorkers > 1:
+        with ProcessPoolExecutor(max_workers=numWorkers) as pool:
+            played = list(pool.map(playGame, games))
+    else:
+        played = [playGame(game) for game in games]
+    results = [result for result, _ in played]
+    if recordPath:
+        with GameWriter(recordPath) as writer:
+            for _, record in played:
+                writer.write(record)
+    return results, summarize(results)
+
+
+def writeResults(results, summary, csvPath=None, jsonPath=None):
+    if csvPath:
+        with open(csvPath, "w", newline="") as csvFile:
+            writer = csv.DictWriter(csvFile, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+    if jsonPath:
+        with open(jsonPath, "w") as jsonFile:
+            json.dump(summary, jsonFile, indent=2)
+
+
+def printSummary(summary):
+    print("{:<24} {:>5} {:>5} {:>5} {:>8} {:>19} {:>10} {:>12}".format(
+        "", "W", "D", "L", "Elo", "95% CI", "s/move", "nodes/s"))
+    for section in ("agents", "pairs"):
+        for name, record in sorted(summary[section].items()):
+            print("{:<24} {:>5} {:>5} {:>5} {:>8.1f} {:>19} {:>10.3f} {:>12.0f}".format(
+                name, record["wins"], record["draws"], record["losses"], record["elo"],
+                "[{:.1f}, {:.1f}]".format(record["eloLow"], record["eloHigh"]),
+                record["timePerMove"], record["nodesPerSecond"]))
+        print("")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel self-play league between the team agents.")
+    parser.add_argument("--agents", nargs="+", default=AGENT_NAMES, choices=AGENT_NAMES)
+    parser.add_argument("--games", type=int, default=20, help="games per pair of agents")
+    parser.add_argument("--opening-plies", type=int, default=4, help="random plies before the agents take over")
+    parser.add_argument("--move-time", type=float, default=1.0, help="seconds per move for AlphaBeta and MCTS")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--csv", help="per-game results")
+    parser.add_argument("--json", help="summary")
+    parser.add_argument("--record", help="append every game to this binary game record file")
+    args = parser.parse_args()
+
+    results, summary = runLeague(args.agents, args.games, args.opening_plies, args.move_time, args.seed, args.workers,
+                                 args.record)
+    writeResults(results, summary, args.csv, args.json)
+    printSummary(summary)
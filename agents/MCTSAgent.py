@@ -1,70 +1,39 @@
 # -*- coding: utf-8 -*-
-import sys
-import copy
 import time
-import random
-
+# Read before the other imports: a one-shot move (ai1.py / ai2.py) is timed from here,
+# since the referee's clock runs while they load.
+PROCESS_START = time.time()
 
-class AtaxxState(object):
-    def __init__(self, board, turn):
-        self.board = board
-        self.turn = turn
-        self.possibleActions = None
-        self._updatePossibleActions()
-
-    def _updatePossibleActions(self):
-        possibleActions = []
-        dupDirection = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        movDirection = [(-2, -2), (-2, -1), (-2, 0), (-2, 1), (-2, 2), (-1, -2), (-1, 2), (0, -2),
-                        (0, 2), (1, -2), (1, 2), (2, -2), (2, -1), (2, 0), (2, 1), (2, 2)]
-        
-        for i in range(7):
-            for j in range(7):
-                if self.board[i][j] == 0:
-                    for direction in dupDirection:
-                        x, y = i + direction[0], j + direction[1]
-                        if 0 <= x < 7 and 0 <= y < 7 and self.board[x][y] == self.turn:
-                            possibleActions.append((x, y, i, j))
-                            break
-        
-        for i in range(7):
-            for j in range(7):
-                if self.board[i][j] == 0:
-                    for direction in movDirection:
-                        x, y = i + direction[0], j + direction[1]
-                        if 0 <= x < 7 and 0 <= y < 7 and self.board[x][y] == self.turn:
-                            possibleActions.append((x, y, i, j))
-        self.possibleActions = possibleActions
-
-    def step(self, action):
-        x, y, i, j = action
-
-        board = copy.deepcopy(self.board)
-        board[i][j] = self.turn
-        if abs(x - i) == 2 or abs(y - j) == 2:
-            board[x][y] = 0
-
-        for k in range(max(0, i - 1), min(7, i + 2)):
-            for l in range(max(0, j - 1), min(7, j + 2)):
-                if board[k][l] == 3 - self.turn:
-                    board[k][l] = self.turn
-
-        turn = 3 - self.turn
-        nextState = AtaxxState(board=board, turn=turn)
-        return nextState
-
-    def isTerminal(self):
-        return len(self.possibleActions) == 0
-
-    def winner(self):
-        playerScores = [None, 0, 0]
-        for i in range(7):
-            for j in range(7):
-                if self.board[i][j] == self.turn:
-                    playerScores[self.turn] += 1
-                else:
-                    playerScores[3 - self.turn] += 1
-        return 1 if playerScores[1] > playerScores[2] else 2
+import os
+import sys
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from AtaxxState import AtaxxState
+from EndgameSolver import EndgameSolver
+from MCTSTree import MCTSTree, DRAW, PROVEN_WIN, PROVEN_LOSS, UNPROVEN, capturePriors
+from OpeningBook import openOpeningBook
+from Pondering import Ponderer, ponderTimeLimit
+from SearchLog import openSearchLog
+from RuleBasedAgent import RuleBasedAgent
+from Symmetry import uniqueActions
+from TimeManager import TimeManager
+
+# Rollouts stop after this many plies and are scored by a static evaluation.
+ROLLOUT_DEPTH = 12
+# Node cap for the engine entry points (about 26 bytes a node in an MCTSTree); a
+# long-lived server keeps its tree between moves and grows it while pondering.
+ENGINE_MAX_NODES = 1000000
+
+
+def _newBatchRollout(randomSeed, evaluator):
+    # Imported on demand: NumPy takes longer to load than the rest of a one-shot move's imports.
+    try:
+        from BatchRollout import BatchRollout
+    except ImportError:
+        return None
+    return BatchRollout(randomSeed, evaluator)
 
 
 class Agent(object):
@@ -86,20 +55,27 @@ class RandomAgent(Agent):
 
 
 class MCTSNode(object):
-    def __init__(self, action, parent):
+    def __init__(self, action, parent, player, prior=1.0):
+        # player is the side that played action, so wins are counted from its point of view.
         self.action, self.parent, self.children = action, parent, []
-        self.wins, self.visits = 0, 0
+        self.player, self.prior = player, prior
+        self.wins, self.visits = 0.0, 0
+        self.proven = UNPROVEN
 
     def expandNode(self, state):
         if not state.isTerminal():
-            for action in state.possibleActions:
-                childNode = MCTSNode(action=action, parent=self)
+            actions = uniqueActions(state)
+            for action, prior in zip(actions, capturePriors(state, actions)):
+                childNode = MCTSNode(action=action, parent=self, player=state.turn, prior=prior)
                 self.children.append(childNode)
 
-    def update(self, win):
-        self.visits += 1
-        if win:
+    def update(self, winner, countVisit=True):
+        if countVisit:
+            self.visits += 1
+        if winner == self.player:
             self.wins += 1
+        elif winner == DRAW:
+            self.wins += 0.5
 
     def isLeaf(self):
         return len(self.children) == 0
@@ -108,69 +84,486 @@ class MCTSNode(object):
         return self.parent is not None
 
     def bestAction(self):
-        bestWinRate, bestAction = 0.0, None
+        # A proven win, else the most visited child not proven lost: robust against
+        # a lucky win rate on a handful of visits.
+        bestKey, bestAction = None, None
         for child in self.children:
-            winRate = 0.5 if child.visits == 0 else child.wins / child.visits
-            if winRate >= bestWinRate:
+            key = (child.proven, child.visits)
+            if bestKey is None or key > bestKey:
                 bestAction = child.action
-                bestWinRate = winRate
+                bestKey = key
         return bestAction
 
-    def chooseChild(self):
-        bestWinRate, bestChild = 0.0, None
+    def chooseChild(self, explorationConstant, selectionPolicy="uct"):
+        logVisits = math.log(self.visits) if self.visits > 0 else 0.0
+        sqrtVisits = math.sqrt(self.visits)
+        bestScore, bestChild = -1.0, None
         for child in self.children:
-            winRate = 0.5 if child.visits == 0 else child.wins / child.visits
-            if winRate >= bestWinRate:
+            if child.proven == PROVEN_LOSS:
+                continue
+            if selectionPolicy == "puct":
+                winRate = 0.5 if child.visits == 0 else child.wins / child.visits
+                score = winRate + explorationConstant * child.prior * sqrtVisits / (1 + child.visits)
+            elif child.visits == 0:
+                return child
+            else:
+                score = child.wins / child.visits + explorationConstant * math.sqrt(logVisits / child.visits)
+            if score > bestScore:
                 bestChild = child
-                bestWinRate = winRate
+                bestScore = score
         return bestChild
 
 
+class MCTSNodeTree(object):
+    # Tree store over linked MCTSNode objects, with the same interface as the
+    # array-backed MCTSTree.
+    def __init__(self, rootPlayer):
+        self.root = MCTSNode(action=None, parent=None, player=rootPlayer)
+
+    @property
+    def size(self):
+        size, stack = 0, [self.root]
+        while stack:
+            node = stack.pop()
+            size += 1
+            stack.extend(node.children)
+        return size
+
+    def isLeaf(self, node):
+        return node.isLeaf()
+
+    def action(self, node):
+        return node.action
+
+    def children(self, node):
+        return node.children
+
+    def stats(self, node):
+        return node.visits, node.wins
+
+    def proven(self, node):
+        return node.proven
+
+    def expand(self, node, state):
+        node.expandNode(state)
+
+    def backpropagate(self, node, winner, countVisit=True):
+        while node is not None:
+            node.update(winner, countVisit)
+            node = node.parent
+
+    def solve(self, node, winner):
+        # Same rule as MCTSTree.solve.
+        result = PROVEN_WIN if winner == node.player else PROVEN_LOSS
+        while True:
+            node.proven = result
+            parent = node.parent
+            if parent is None:
+                return
+            if result == PROVEN_LOSS and any(child.proven != PROVEN_LOSS for child in parent.children):
+                return
+            result, node = -result, parent
+
+    def chooseChild(self, node, explorationConstant, selectionPolicy="uct"):
+        return node.chooseChild(explorationConstant, selectionPolicy)
+
+    def bestAction(self):
+        return self.root.bestAction()
+
+    def reroot(self, node):
+        node.parent = None
+        self.root = node
+
+
+def _rootParallelSearch(pieces, turn, deadline, seed, options):
+    # Runs in a worker process: one independent search from the shared root until
+    # the parent's deadline, returning root-child statistics keyed by action.
+    agent = MCTSAgent(timeLimit=None, player=turn, reuseTree=False, randomSeed=seed, **options)
+    state = AtaxxState.fromBitboards(pieces, turn)
+    tree = agent._newTree(3 - turn)
+    agent._search(tree, state, deadline)
+    childStats = {}
+    for child in tree.children(tree.root):
+        childStats[tree.action(child)] = tree.stats(child) + (tree.proven(child),)
+    return childStats, agent.iterations
+
+
 class MCTSAgent(Agent):
-    def __init__(self, timeLimit, player):
+    def __init__(self, timeLimit, player, explorationConstant=1.4, selectionPolicy="uct", reuseTree=True,
+                 treeStorage="object", maxNodes=4000000, numWorkers=1, randomSeed=None, maxIterations=None,
+                 ipcMargin=0.2, rolloutBatchSize=0, openingBook=None, endgameThreshold=3, endgameTimeShare=0.25,
+                 simulationPolicy="random", ponder=False, searchLog=None, timeManager=None,
+                 rolloutDepth=ROLLOUT_DEPTH, evaluator=None):
         super(MCTSAgent, self).__init__()
         self.timeLimit = timeLimit
         self.player = player
-        self.simulationAgent = RandomAgent()
+        self.explorationConstant = explorationConstant
+        self.selectionPolicy = selectionPolicy
+        self.reuseTree = reuseTree
+        self.treeStorage = treeStorage
+        self.maxNodes = maxNodes
+        self.numWorkers = numWorkers
+        self.randomSeed = randomSeed
+        self.maxIterations = maxIterations
+        self.ipcMargin = ipcMargin
+        self.rolloutBatchSize = rolloutBatchSize
+        self.openingBook = openingBook
+        self.endgameSolver = EndgameSolver(emptyThreshold=endgameThreshold) if endgameThreshold > 0 else None
+        self.endgameTimeShare = endgameTimeShare
+        self.simulationPolicy = simulationPolicy
+        # "rule" plays heavy rollouts with RuleBasedAgent's move scores instead of uniform moves.
+        self.simulationAgent = RandomAgent(randomSeed)
+        if simulationPolicy == "rule":
+            self.simulationAgent = RuleBasedAgent(player)
+        # Rollouts cut off after rolloutDepth plies go to the side ahead on material,
+        # or by the evaluator (e.g. a PatternEvaluator) when given; a level position is a draw.
+        self.rolloutDepth = rolloutDepth
+        self.evaluator = evaluator
+        self.ponder = ponder
+        self.searchLog = searchLog
+        self.timeManager = timeManager
+        self.iterations = 0
+        self.ponderIterations = 0
+
+        self._pool = None
+        self._moveNumber = 0
+        # Batched NumPy rollouts are used only when requested and NumPy is installed.
+        self._batchRollout = _newBatchRollout(randomSeed, evaluator) if rolloutBatchSize else None
+
+        self._tree, self._rootState = None, None
+        self._ponderer = Ponderer()
+        self._profile = None
+        self._rolloutPlies = 0
+        self._actionSource = None
+
+    def _newTree(self, rootPlayer):
+        if self.treeStorage == "array":
+            return MCTSTree(rootPlayer, maxNodes=self.maxNodes)
+        return MCTSNodeTree(rootPlayer)
+
+    def _reuseTree(self, state):
+        # The stored root is the position after our last move; its child matching
+        # the opponent's reply becomes the new root.
+        tree = self._tree
+        if self.reuseTree and tree is not None:
+            for child in tree.children(tree.root):
+                afterReply = self._rootState.step(tree.action(child))
+                if afterReply.hash == state.hash and afterReply.turn == state.turn:
+                    tree.reroot(child)
+                    return tree
+        return self._newTree(3 - state.turn)
+
+    def _selectAndExpand(self, tree, state):
+        node, simulationState = self._select(tree, state)
+        return self._expand(tree, node, simulationState)
+
+    def _select(self, tree, state):
+        node, simulationState = tree.root, state.copy()
+        while not tree.isLeaf(node):
+            node = tree.chooseChild(node, self.explorationConstant, self.selectionPolicy)
+            simulationState.make(tree.action(node))
+        return node, simulationState
+
+    def _expand(self, tree, node, simulationState):
+        if not simulationState.isTerminal():
+            tree.expand(node, simulationState)
+            if not tree.isLeaf(node):
+                node = tree.chooseChild(node, self.explorationConstant, self.selectionPolicy)
+                simulationState.make(tree.action(node))
+        return node, simulationState
+
+    def _cutoffWinner(self, state):
+        if self.evaluator is not None:
+            value = self.evaluator.evaluate(state, 1)
+        else:
+            value = state.score(1) - state.score(2)
+        if value == 0:
+            return DRAW
+        return 1 if value > 0 else 2
+
+    def _simulate(self, tree, node, simulationState):
+        # A finished game proves node; otherwise a rollout of at most rolloutDepth plies.
+        if simulationState.isTerminal():
+            self._rolloutPlies = 0
+            winner = simulationState.winner()
+            tree.solve(node, winner)
+            return winner
+        plies = 0
+        while not simulationState.isTerminal():
+            if plies >= self.rolloutDepth:
+                self._rolloutPlies = plies
+                return self._cutoffWinner(simulationState)
+            action = self.simulationAgent.getAction(simulationState)
+            simulationState.make(action)
+            plies += 1
+        self._rolloutPlies = plies
+        return simulationState.winner()
+
+    def _iterate(self, tree, state):
+        # One search step; returns the number of rollouts it played.
+        if self._batchRollout is not None:
+            return self._searchBatch(tree, state)
+
+        node, simulationState = self._selectAndExpand(tree, state)
+
+        # Simulation
+        winner = self._simulate(tree, node, simulationState)
+
+        # Backpropagation
+        tree.backpropagate(node, winner)
+        return 1
+
+    def _iterateProfiled(self, tree, state):
+        # _iterate with every phase timed into self._profile.
+        profile = self._profile
+        if self._batchRollout is not None:
+            return self._searchBatch(tree, state, profile)
+
+        phaseStart = time.time()
+        node, simulationState = self._select(tree, state)
+        selected = time.time()
+        node, simulationState = self._expand(tree, node, simulationState)
+        expanded = time.time()
+        winner = self._simulate(tree, node, simulationState)
+        simulated = time.time()
+        tree.backpropagate(node, winner)
+        finished = time.time()
+
+        profile["selection"] += selected - phaseStart
+        profile["expansion"] += expanded - selected
+        profile["simulation"] += simulated - expanded
+        profile["backpropagation"] += finished - simulated
+        profile["rollouts"] += 1
+        profile["rolloutPlies"] += self._rolloutPlies
+        profile["maxRolloutPlies"] = max(profile["maxRolloutPlies"], self._rolloutPlies)
+        return 1
+
+    def _rootLeader(self, tree):
+        # (most visited root action, its share of the root children's visits)
+        totalVisits, bestVisits, bestAction = 0, -1, None
+        for child in tree.children(tree.root):
+            visits = tree.stats(child)[0]
+            totalVisits += visits
+            if visits > bestVisits:
+                bestAction = tree.action(child)
+                bestVisits = visits
+        return bestAction, bestVisits / totalVisits if totalVisits else 0.0
+
+    def _search(self, tree, state, deadline):
+        self.iterations = 0
+        iterate = self._iterateProfiled if self._profile is not None else self._iterate
+        timeManager = self.timeManager
+        # The first check waits a full interval: one iteration's visit share says nothing.
+        now = time.time()
+        nextCheck = now + (timeManager.checkInterval if timeManager is not None else 0.0)
+        while now < deadline and tree.proven(tree.root) == UNPROVEN:
+            if self.maxIterations is not None and self.iterations >= self.maxIterations:
+                break
+            self.iterations += iterate(tree, state)
+            now = time.time()
+            if timeManager is not None and now >= nextCheck:
+                nextCheck = now + timeManager.checkInterval
+                timeManager.observe(*self._rootLeader(tree))
+                if timeManager.timeUp():
+                    break
 
-        self._gameEarlyEnd = 200
+    def _ponder(self, tree, state):
+        # Keeps growing the kept subtree, rooted at the opponent's turn, until the
+        # real reply arrives; _reuseTree then picks up the matching child. A full
+        # tree only adds rollouts to the same leaves, so pondering stops there.
+        self.ponderIterations = 0
+        deadline = time.time() + ponderTimeLimit(self.timeLimit)
+        while not self._ponderer.stopEvent.is_set() and tree.proven(tree.root) == UNPROVEN:
+            if (isinstance(tree, MCTSTree) and tree.size >= tree.maxNodes) or time.time() >= deadline:
+                break
+            self.ponderIterations += self._iterate(tree, state)
+
+    def stopPondering(self):
+        self._ponderer.stop()
+
+    def _searchBatch(self, tree, state, profile=None):
+        # Selects rolloutBatchSize leaves, each visit counted up front as a virtual
+        # loss to spread the selections, then plays all rollouts at once. With a
+        # profile, selection time includes expansion and the virtual-loss updates.
+        phaseStart = time.time() if profile is not None else 0.0
+        leaves, leafStates, selections = [], [], 0
+        for _ in range(self.rolloutBatchSize):
+            if tree.proven(tree.root) != UNPROVEN:
+                break
+            selections += 1
+            node, simulationState = self._selectAndExpand(tree, state)
+            tree.backpropagate(node, None)
+            if simulationState.isTerminal():
+                winner = simulationState.winner()
+                tree.solve(node, winner)
+                tree.backpropagate(node, winner, countVisit=False)
+            else:
+                leaves.append(node)
+                leafStates.append(simulationState)
+
+        if profile is not None:
+            selected, plies = time.time(), self._batchRollout.plies
+            profile["selection"] += selected - phaseStart
+
+        if leaves:
+            winners = self._batchRollout.run(leafStates, self.rolloutDepth)
+            if profile is not None:
+                simulated = time.time()
+                profile["simulation"] += simulated - selected
+                profile["rollouts"] += len(leaves)
+                profile["rolloutPlies"] += self._batchRollout.plies - plies
+            for node, winner in zip(leaves, winners):
+                tree.backpropagate(node, winner, countVisit=False)
+            if profile is not None:
+                profile["backpropagation"] += time.time() - simulated
+        return selections
 
     def _MCTS(self, state, startTime):
-        rootNode = MCTSNode(action=None, parent=None)
-        while time.time() - startTime < self.timeLimit:
-            node, state = rootNode, copy.deepcopy(state)
-
-            # Selection
-            while not node.isLeaf():
-                node = node.chooseChild()
-                state.step(node.action)
-
-            # Expansion
-            if not state.isTerminal():
-                node.expandNode(state)
-                node = node.chooseChild()
-
-            # Simulation
-            gameCount, earlyEnd = 0, False
-            while not state.isTerminal():
-                if gameCount > self._gameEarlyEnd:
-                    earlyEnd = True
-                    break
-                action = self.simulationAgent.getAction(state)
-                state = state.step(action)
-                gameCount += 1
-            win = (not earlyEnd) and (state.winner() == self.player)
+        tree = self._reuseTree(state)
+        deadline = startTime + self.timeLimit if self.timeManager is None else self.timeManager.deadline
+        self._search(tree, state, deadline)
+        if self._profile is not None:
+            self._profile["treeSize"] = tree.size
+        if tree.proven(tree.root) != UNPROVEN:
+            self._actionSource = "solved"
+
+        action = tree.bestAction()
+        self._tree, self._rootState = None, None
+        for child in tree.children(tree.root):
+            if tree.action(child) == action:
+                tree.reroot(child)
+                self._tree, self._rootState = tree, state.step(action)
+                break
+        return action
 
-            # Backpropagation
-            while node.hasParent():
-                node.update(win)
-                node = node.parent
-        return rootNode.bestAction()
+    def _rootParallelMCTS(self, state, startTime):
+        # Root parallelism: every worker searches the same root with its own seed,
+        # and root-child visits and wins are summed at the deadline.
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.numWorkers)
+        # Workers cannot report back while searching, so they get the manager's target
+        # as an absolute deadline: time spent starting a worker comes out of its search.
+        endTime = startTime + self.timeLimit if self.timeManager is None else self.timeManager.softDeadline()
+        deadline = endTime - self.ipcMargin
+        options = {
+            "explorationConstant": self.explorationConstant,
+            "selectionPolicy": self.selectionPolicy,
+            "treeStorage": self.treeStorage,
+            "maxNodes": self.maxNodes,
+            "maxIterations": self.maxIterations,
+            "rolloutBatchSize": self.rolloutBatchSize,
+            "simulationPolicy": self.simulationPolicy,
+            "rolloutDepth": self.rolloutDepth,
+            "evaluator": self.evaluator,
+        }
+        baseSeed = random.getrandbits(32) if self.randomSeed is None else self.randomSeed
+        futures = [self._pool.submit(_rootParallelSearch, list(state.pieces), state.turn, deadline,
+                                     (baseSeed + 7919 * self._moveNumber + worker) & 0xFFFFFFFF, options)
+                   for worker in range(self.numWorkers)]
+
+        mergedStats, self.iterations = {}, 0
+        for future in futures:
+            childStats, iterations = future.result()
+            self.iterations += iterations
+            for action, (visits, wins, proven) in childStats.items():
+                totalVisits, totalWins, anyProven = mergedStats.get(action, (0, 0, UNPROVEN))
+                # Workers search the same position, so their proofs never disagree.
+                mergedStats[action] = (totalVisits + visits, totalWins + wins, anyProven or proven)
+
+        bestKey, bestAction = None, None
+        for action in state.possibleActions:
+            visits, _, proven = mergedStats.get(action, (0, 0, UNPROVEN))
+            if bestKey is None or (proven, visits) > bestKey:
+                bestAction = action
+                bestKey = (proven, visits)
+        return bestAction
 
-    def getAction(self, state):
-        action = self._MCTS(state=state, startTime=time.time())
+    def close(self):
+        self.stopPondering()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def getAction(self, state, startTime=None):
+        # startTime: when the move's clock started, if before this call.
+        if startTime is None:
+            startTime = time.time()
+        self.stopPondering()
+        self.iterations = 0
+        if self.timeManager is not None:
+            # Forced and book moves never start the manager, so they log no target.
+            self.timeManager.reset()
+        if self.searchLog is not None:
+            self._profile = {"selection": 0.0, "expansion": 0.0, "simulation": 0.0, "backpropagation": 0.0,
+                             "rollouts": 0, "rolloutPlies": 0, "maxRolloutPlies": 0, "treeSize": None}
+        action = self._selectAction(state, startTime)
+        if self.searchLog is not None:
+            self._logMove(state, action, time.time() - startTime)
+        if self.ponder and self._tree is not None and not self._rootState.isTerminal():
+            self._ponderer.start(self._ponder, self._tree, self._rootState)
         return action
 
+    def _logMove(self, state, action, seconds):
+        profile = self._profile
+        rollouts = profile.pop("rollouts")
+        rolloutPlies = profile.pop("rolloutPlies")
+        # Batched rollouts only report total plies, so there is no maximum for them.
+        maxRolloutPlies = profile.pop("maxRolloutPlies")
+        if self._batchRollout is not None:
+            maxRolloutPlies = None
+        record = {"agent": "MCTS", "player": self.player, "move": self._moveNumber,
+                  "action": list(action) if action is not None else None, "source": self._actionSource,
+                  "seconds": seconds, "iterations": self.iterations,
+                  "iterationsPerSecond": self.iterations / seconds if seconds else 0.0,
+                  "meanRolloutPlies": rolloutPlies / rollouts if rollouts else None,
+                  "maxRolloutPlies": maxRolloutPlies, "treeSize": profile.pop("treeSize"),
+                  "phases": profile}
+        if self.timeManager is not None:
+            record["timeTarget"] = self.timeManager.target
+        self.searchLog.write(record)
+
+    def _selectAction(self, state, startTime):
+        self._moveNumber += 1
+        if len(state.possibleActions) == 1:
+            self._tree, self._rootState = None, None
+            self._actionSource = "forced"
+            return state.possibleActions[0]
+
+        if self.openingBook is not None:
+            action = self.openingBook.lookup(state)
+            if action is not None:
+                self._tree, self._rootState = None, None
+                self._actionSource = "book"
+                return action
+
+        # As in AlphaBetaAgent, the solver's time comes out of the manager's target.
+        budget = self.timeLimit
+        if self.timeManager is not None:
+            self.timeManager.startMove(state, startTime, self.timeLimit)
+            budget = self.timeManager.target
+        if self.endgameSolver is not None:
+            action = self.endgameSolver.provenAction(state, budget * self.endgameTimeShare)
+            if action is not None:
+                self._tree, self._rootState = None, None
+                self._actionSource = "endgame"
+                return action
+
+        if self.numWorkers > 1:
+            # Workers are not profiled; the record carries the merged iteration count only.
+            self._actionSource = "parallel"
+            return self._rootParallelMCTS(state=state, startTime=startTime)
+        self._actionSource = "search"
+        action = self._MCTS(state=state, startTime=startTime)
+        return action
+
+
+def createEngineAgent(player, timeLimit=7, ponder=False):
+    # The agent as deployed, shared by this script (ai1.py / ai2.py) and AgentServer.
+    openingBook = openOpeningBook(os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening.book"))
+    return MCTSAgent(timeLimit=timeLimit, player=player, treeStorage="array", maxNodes=ENGINE_MAX_NODES,
+                     openingBook=openingBook, ponder=ponder, searchLog=openSearchLog(os.environ.get("ATAXX_SEARCH_LOG")),
+                     timeManager=TimeManager(softTargets=ponder))
+
 
 if __name__ == "__main__":
     input_str = sys.stdin.read()
@@ -189,7 +582,7 @@ if __name__ == "__main__":
 
         state = AtaxxState(board=board, turn=player)
 
-        agent = MCTSAgent(timeLimit=7, player=player)
-        action = agent.getAction(state=state)
+        agent = createEngineAgent(player)
+        action = agent.getAction(state=state, startTime=PROCESS_START)
 
         sys.stdout.write("{} {} {} {}" .format(*action))
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Array-backed MCTS tree: node n lives at index n of a set of parallel arrays, and
+# the children of a node occupy one contiguous index range.
+#
+# Both trees are MCTS-Solver trees: a node is proven won or lost for the player
+# who moved into it once its game is over, once one of its replies is a proven
+# win for the opponent, or once all of them are proven losses. Selection skips
+# children proven lost for the side to move, and a proven root ends the search.
+import math
+from array import array
+
+from AtaxxState import BOARD_SIZE, NEIGHBOR_MASKS, NO_ACTION, packAction, unpackAction, popcount
+from Symmetry import uniqueActions
+
+NO_NODE = -1
+UNPROVEN, PROVEN_WIN, PROVEN_LOSS = 0, 1, -1
+# Winner of a rollout cut off in a level position: half a win for each side.
+DRAW = 0
+
+
+def capturePriors(state, actions):
+    opp = state.pieces[3 - state.turn]
+    weights = [1 + popcount(NEIGHBOR_MASKS[i * BOARD_SIZE + j] & opp) for _, _, i, j in actions]
+    total = float(sum(weights))
+    return [weight / total for weight in weights]
+
+
+class MCTSTree(object):
+    def __init__(self, rootPlayer, maxNodes=4000000):
+        self.maxNodes = maxNodes
+        self._allocate()
+        self.root = self._append(NO_ACTION, NO_NODE, rootPlayer, 1.0)
+
+    def _allocate(self):
+        self.visits = array("I")
+        self.wins = array("f")
+        self.priors = array("f")
+        self.parents = array("i")
+        self.firstChildren = array("i")
+        self.childCounts = array("H")
+        self.actions = array("H")
+        self.players = array("B")
+        self.provens = array("b")
+
+    def _append(self, packedAction, parent, player, prior, visits=0, wins=0.0, proven=UNPROVEN):
+        self.visits.append(visits)
+        self.wins.append(wins)
+        self.priors.append(prior)
+        self.parents.append(parent)
+        self.firstChildren.append(NO_NODE)
+        self.childCounts.append(0)
+        self.actions.append(packedAction)
+        self.players.append(player)
+        self.provens.append(proven)
+        return len(self.visits) - 1
+
+    @property
+    def size(self):
+        return len(self.visits)
+
+    def nodeBytes(self):
+        return sum(values.itemsize for values in (self.visits, self.wins, self.priors, self.parents,
+                                                  self.firstChildren, self.childCounts, self.actions, self.players,
+                                                  self.provens))
+
+    def isLeaf(self, node):
+        return self.childCounts[node] == 0
+
+    def action(self, node):
+        return unpackAction(self.actions[node])
+
+    def children(self, node):
+        first = self.firstChildren[node]
+        return range(first, first + self.childCounts[node])
+
+    def stats(self, node):
+        return self.visits[node], self.wins[node]
+
+    def proven(self, node):
+        return self.provens[node]
+
+    def expand(self, node, state):
+        # A full tree stops growing; its leaves keep being simulated as they are.
+        if state.isTerminal() or self.size >= self.maxNodes:
+            return
+        actions = uniqueActions(state)
+        self.firstChildren[node] = self.size
+        self.childCounts[node] = len(actions)
+        for action, prior in zip(actions, capturePriors(state, actions)):
+            self._append(packAction(action), node, state.turn, prior)
+
+    def backpropagate(self, node, winner, countVisit=True):
+        visits, wins, parents, players = self.visits, self.wins, self.parents, self.players
+        while node != NO_NODE:
+            if countVisit:
+                visits[node] += 1
+            if winner == players[node]:
+                wins[node] += 1
+            elif winner == DRAW:
+                wins[node] += 0.5
+            node = parents[node]
+
+    def solve(self, node, winner):
+        # node's game is over with winner; the proof is carried up as far as it decides ancestors.
+        provens, parents = self.provens, self.parents
+        result = PROVEN_WIN if winner == self.players[node] else PROVEN_LOSS
+        while True:
+            provens[node] = result
+            parent = parents[node]
+            if parent == NO_NODE:
+                return
+            if result == PROVEN_LOSS and any(provens[child] != PROVEN_LOSS for child in self.children(parent)):
+                return
+            result, node = -result, parent
+
+    def chooseChild(self, node, explorationConstant, selectionPolicy="uct"):
+        visits, wins = self.visits, self.wins
+        parentVisits = visits[node]
+        logVisits = math.log(parentVisits) if parentVisits > 0 else 0.0
+        sqrtVisits = math.sqrt(parentVisits)
+        bestScore, bestChild = -1.0, NO_NODE
+        for child in self.children(node):
+            if self.provens[child] == PROVEN_LOSS:
+                continue
+            childVisits = visits[child]
+            if selectionPolicy == "puct":
+                winRate = 0.5 if childVisits == 0 else wins[child] / childVisits
+                score = winRate + explorationConstant * self.priors[child] * sqrtVisits / (1 + childVisits)
+            elif childVisits == 0:
+                return child
+            else:
+                score = wins[child] / childVisits + explorationConstant * math.sqrt(logVisits / childVisits)
+            if score > bestScore:
+                bestChild = child
+                bestScore = score
+        return bestChild
+
+    def bestAction(self):
+        # A proven win, else the most visited child not proven lost.
+        bestKey, bestChild = None, NO_NODE
+        for child in self.children(self.root):
+            key = (self.provens[child], self.visits[child])
+            if bestKey is None or key > bestKey:
+                bestChild = child
+                bestKey = key
+        return None if bestChild == NO_NODE else self.action(bestChild)
+
+    def reroot(self, node):
+        # Copies the subtree under node into fresh arrays, breadth first, so the
+        # discarded part of the old tree is freed and child ranges stay contiguous.
+        old = (self.visits, self.wins, self.priors, self.parents,
+               self.firstChildren, self.childCounts, self.actions, self.players, self.provens)
+        oldVisits, oldWins, oldPriors, _, oldFirstChildren, oldChildCounts, oldActions, oldPlayers, oldProvens = old
+        self._allocate()
+        self.root = self._append(NO_ACTION, NO_NODE, oldPlayers[node], 1.0, oldVisits[node], oldWins[node],
+                                 oldProvens[node])
+
+        queue = [(node, self.root)]
+        for oldNode, newNode in queue:
+            count = oldChildCounts[oldNode]
+            if count == 0:
+                continue
+            self.firstChildren[newNode] = self.size
+            self.childCounts[newNode] = count
+            first = oldFirstChildren[oldNode]
+            for oldChild in range(first, first + count):
+                newChild = self._append(oldActions[oldChild], newNode, oldPlayers[oldChild], oldPriors[oldChild],
+                                        oldVisits[oldChild], oldWins[oldChild], oldProvens[oldChild])
+                queue.append((oldChild, newChild))
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# Opening book: best move and score for positions in the first plies of the game,
+# stored as a hash-indexed table of fixed-width slots and read through mmap.
+# Positions are keyed by their symmetry-canonical hash and moves are stored in the
+# canonical orientation, so one entry serves all symmetric images of a position.
+#
+# File layout (little endian):
+#   header  "ATXB" | version u16 | reserved u16 | numSlots u32   (12 bytes)
+#   slot    key u64 | packedAction u16 | score i16 | depth u8 | padding (16 bytes)
+# Slots are open-addressed by key & (numSlots - 1) with linear probing; an empty
+# slot has packedAction NO_ACTION.
+import os
+import sys
+import mmap
+import struct
+import argparse
+
+from AtaxxState import AtaxxState, NO_ACTION, initialBoard, packAction, unpackAction
+from Symmetry import canonicalHash, inverse, matchAction, transformAction, uniqueActions
+
+MAGIC = b"ATXB"
+VERSION = 2
+HEADER = struct.Struct("<4sHHI")
+SLOT = struct.Struct("<QHhB3x")
+
+
+class OpeningBook(object):
+    def __init__(self, path):
+        with open(path, "rb") as bookFile:
+            self._map = mmap.mmap(bookFile.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, numSlots = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not an opening book: {}".format(path))
+        self.numSlots = numSlots
+        self._mask = numSlots - 1
+
+    def close(self):
+        self._map.close()
+
+    def probe(self, key):
+        # Returns (action, score, depth) or None.
+        index = key & self._mask
+        for _ in range(self.numSlots):
+            slotKey, packedAction, score, depth = SLOT.unpack_from(self._map, HEADER.size + index * SLOT.size)
+            if packedAction == NO_ACTION:
+                return None
+            if slotKey == key:
+                return unpackAction(packedAction), score, depth
+            index = (index + 1) & self._mask
+        return None
+
+    def lookup(self, state):
+        key, transform = canonicalHash(state)
+        entry = self.probe(key)
+        if entry is None:
+            return None
+        return matchAction(state, transformAction(entry[0], inverse(transform)))
+
+
+def openOpeningBook(path):
+    return OpeningBook(path) if path and os.path.exists(path) else None
+
+
+def writeBook(path, entries):
+    # entries: {key: (action, score, depth)}; the table is kept at most half full.
+    numSlots = 1
+    while numSlots < 2 * max(len(entries), 1):
+        numSlots *= 2
+    mask = numSlots - 1
+
+    data = bytearray(HEADER.size + numSlots * SLOT.size)
+    HEADER.pack_into(data, 0, MAGIC, VERSION, 0, numSlots)
+    for index in range(numSlots):
+        SLOT.pack_into(data, HEADER.size + index * SLOT.size, 0, NO_ACTION, 0, 0)
+    for key, (action, score, depth) in entries.items():
+        index = key & mask
+        while SLOT.unpack_from(data, HEADER.size + index * SLOT.size)[1] != NO_ACTION:
+            index = (index + 1) & mask
+        SLOT.pack_into(data, HEADER.size + index * SLOT.size, key, packAction(action),
+                       max(-32768, min(32767, score)), depth)
+    with open(path, "wb") as bookFile:
+        bookFile.write(data)
+
+
+def buildBook(plies, depth, log=None):
+    # For each book side, the side's own positions follow only the searched best
+    # move while every opponent reply is expanded, for the first `plies` plies.
+    # Symmetric positions and replies are searched once.
+    from AlphaBetaAgent import AlphaBetaAgent
+
+    entries = {}
+    for bookSide in (1, 2):
+        frontier = [AtaxxState(initialBoard(), 1)]
+        for ply in range(plies):
+            nextFrontier, seen = [], set()
+            for state in frontier:
+                if state.isTerminal():
+                    continue
+                if state.turn == bookSide:
+                    key, transform = canonicalHash(state)
+                    if key not in entries:
+                        agent = AlphaBetaAgent(maxDepth=depth, player=state.turn)
+                        action = agent.getAction(state)
+                        entries[key] = (transformAction(action, transform), agent.rootValue, depth)
+                    children = [state.step(transformAction(entries[key][0], inverse(transform)))]
+                else:
+                    children = [state.step(action) for action in uniqueActions(state)]
+                for child in children:
+                    childKey = canonicalHash(child)[0]
+                    if childKey not in seen:
+                        seen.add(childKey)
+                        nextFrontier.append(child)
+            frontier = nextFrontier
+            if log is not None:
+                log("side {} ply {}: {} positions, {} book entries".format(bookSide, ply + 1, len(frontier), len(entries)))
+    return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the opening book by searching the first plies offline.")
+    parser.add_argument("path")
+    parser.add_argument("--plies", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=5, help="alpha-beta depth per book position")
+    args = parser.parse_args()
+
+    entries = buildBook(args.plies, args.depth, log=lambda message: sys.stderr.write(message + "\n"))
+    writeBook(args.path, entries)
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# Table-driven evaluation: every row and column of the board is a 7-cell pattern
+# whose ternary index (0 empty, 1 own, 2 opponent) selects a weight. Row r and
+# column r share a table, as do r and 6 - r, so four tables cover all 14 lines.
+# At load the tables are expanded to be indexed by a line's raw own and opponent
+# bits, with the piece count folded into the row tables, so a leaf costs 14 list
+# lookups; a column's own and opponent bits are gathered with one multiply.
+#
+# The tables hold a correction to the material count for the side to move, in
+# units of 1 / WEIGHT_SCALE pieces: by default what a shallow search finds beyond
+# the current material, so a leaf sees a little past the horizon. They are fitted
+# offline by ridge least squares on positions from recorded games (GameRecord
+# files) and stored as a flat little-endian int32 array.
+import os
+import sys
+import array
+import argparse
+
+from AtaxxState import AtaxxState, BOARD_SIZE, NUM_SQUARES, initialBoard, popcount
+
+WEIGHT_SCALE = 64
+LINE_MASK = (1 << BOARD_SIZE) - 1
+COLUMN_MASK = sum(1 << (BOARD_SIZE * row) for row in range(BOARD_SIZE))
+# (column bits at 0, 7, ..., 42) * COLUMN_MAGIC puts them at bits 42..48 without carries.
+COLUMN_MAGIC = sum(1 << (BOARD_SIZE * (BOARD_SIZE - 1) - (BOARD_SIZE - 1) * row) for row in range(BOARD_SIZE))
+COLUMN_SHIFT = BOARD_SIZE * (BOARD_SIZE - 1)
+# With the opponent's bits OPP_COLUMN_SHIFT above our own, the same multiply puts
+# its column at bits 98..104 (checked carry-free for every own/opponent pair).
+OPP_COLUMN_SHIFT = 56
+PAIR_COLUMN_MASK = COLUMN_MASK | COLUMN_MASK << OPP_COLUMN_SHIFT
+OPP_KEY_SHIFT = COLUMN_SHIFT + OPP_COLUMN_SHIFT - BOARD_SIZE
+# A line key is own bits | opponent bits << 7.
+OPP_KEY_MASK = LINE_MASK << BOARD_SIZE
+NUM_LINE_KEYS = 1 << (2 * BOARD_SIZE)
+
+PATTERN_SIZE = 3 ** BOARD_SIZE
+NUM_TABLES = (BOARD_SIZE + 1) // 2
+NUM_WEIGHTS = NUM_TABLES * PATTERN_SIZE
+LINE_OFFSETS = [min(line, BOARD_SIZE - 1 - line) * PATTERN_SIZE for line in range(BOARD_SIZE)]
+
+
+def _ternary(mask):
+    value = 0
+    for cell in reversed(range(BOARD_SIZE)):
+        value = 3 * value + ((mask >> cell) & 1)
+    return value
+
+
+OWN_DIGITS = [_ternary(mask) for mask in range(1 << BOARD_SIZE)]
+OPP_DIGITS = [2 * digits for digits in OWN_DIGITS]
+# (line key, pattern digits, piece difference) of every legal line.
+LINE_PATTERNS = [(own | opp << BOARD_SIZE, OWN_DIGITS[own] + OPP_DIGITS[opp], popcount(own) - popcount(opp))
+                 for own in range(1 << BOARD_SIZE) for opp in range(1 << BOARD_SIZE) if not own & opp]
+
+
+def patternIndices(own, opp):
+    # Flat weight indices of the 14 lines, rows first.
+    indices = []
+    for line in range(BOARD_SIZE):
+        shift = BOARD_SIZE * line
+        indices.append(LINE_OFFSETS[line] + OWN_DIGITS[(own >> shift) & LINE_MASK] +
+                       OPP_DIGITS[(opp >> shift) & LINE_MASK])
+    for line in range(BOARD_SIZE):
+        ownColumn = ((((own >> line) & COLUMN_MASK) * COLUMN_MAGIC) >> COLUMN_SHIFT) & LINE_MASK
+        oppColumn = ((((opp >> line) & COLUMN_MASK) * COLUMN_MAGIC) >> COLUMN_SHIFT) & LINE_MASK
+        indices.append(LINE_OFFSETS[line] + OWN_DIGITS[ownColumn] + OPP_DIGITS[oppColumn])
+    return indices
+
+
+class PatternEvaluator(object):
+    def __init__(self, weights):
+        if len(weights) != NUM_WEIGHTS:
+            raise ValueError("Expected {} pattern weights, got {}".format(NUM_WEIGHTS, len(weights)))
+        self.weights = list(weights)
+        rowTables = [self._lineTable(table, True) for table in range(NUM_TABLES)]
+        columnTables = [self._lineTable(table, False) for table in range(NUM_TABLES)]
+        self._rowTables = [(BOARD_SIZE * line, rowTables[LINE_OFFSETS[line] // PATTERN_SIZE])
+                           for line in range(BOARD_SIZE)]
+        self._columnTables = [(line, columnTables[LINE_OFFSETS[line] // PATTERN_SIZE]) for line in range(BOARD_SIZE)]
+
+    def _lineTable(self, table, withPieces):
+        lineTable, offset = [0] * NUM_LINE_KEYS, table * PATTERN_SIZE
+        for key, digits, difference in LINE_PATTERNS:
+            lineTable[key] = self.weights[offset + digits] + (difference * WEIGHT_SCALE if withPieces else 0)
+        return lineTable
+
+    def evaluate(self, state, player):
+        # Piece difference for player plus the pattern correction, times WEIGHT_SCALE.
+        # The tables are fitted from the side to move, so the tempo is part of them.
+        own, opp = state.pieces[state.turn], state.pieces[3 - state.turn]
+        value = 0
+        for shift, table in self._rowTables:
+            value += table[(own >> shift) & LINE_MASK | ((opp >> shift) & LINE_MASK) << BOARD_SIZE]
+        both = own | opp << OPP_COLUMN_SHIFT
+        for line, table in self._columnTables:
+            product = ((both >> line) & PAIR_COLUMN_MASK) * COLUMN_MAGIC
+            value += table[(product >> COLUMN_SHIFT) & LINE_MASK | (product >> OPP_KEY_SHIFT) & OPP_KEY_MASK]
+        return value if player == state.turn else -value
+
+    def save(self, path):
+        values = array.array("i", self.weights)
+        if sys.byteorder != "little":
+            values.byteswap()
+        with open(path, "wb") as weightsFile:
+            values.tofile(weightsFile)
+
+    @classmethod
+    def load(cls, path):
+        values = array.array("i")
+        with open(path, "rb") as weightsFile:
+            values.frombytes(weightsFile.read())
+        if sys.byteorder != "little":
+            values.byteswap()
+        return cls(values)
+
+
+def openPatternEvaluator(path):
+    return PatternEvaluator.load(path) if path and os.path.exists(path) else None
+
+
+def _finalDifference(state, player):
+    # Piece difference at the end of a game, with the referee's fill of a blocked side's empties.
+    if state.isTerminal():
+        moverScore = state.score(state.turn)
+        scores = [None, 0, 0]
+        scores[state.turn], scores[3 - state.turn] = moverScore, NUM_SQUARES - moverScore
+        return scores[player] - scores[3 - player]
+    return state.score(player) - state.score(3 - player)
+
+
+def gamePositions(paths, searchDepth=2, skipPlies=0):
+    # (indices, target) for the side to move in every position after skipPlies of the
+    # given record files. The target is how far material moves from its current value:
+    # to the alpha-beta value at searchDepth, or with searchDepth 0 to the final piece
+    # difference. Positions whose search already sees the end of the game are skipped.
+    from GameRecord import readGames
+    from AlphaBetaAgent import AlphaBetaAgent, DEPTH_SCALE, WIN_VALUE
+
+    for path in paths:
+        for record in readGames(path):
+            states = [AtaxxState(initialBoard(), 1)]
+            for action in record.actions:
+                states.append(states[-1].step(action))
+            for state in states[skipPlies:]:
+                player = state.turn
+                material = state.score(player) - state.score(3 - player)
+                if searchDepth > 0:
+                    if state.isTerminal():
+                        continue
+                    agent = AlphaBetaAgent(maxDepth=searchDepth, player=player, ttMemoryBudget=1 << 16,
+                                           endgameThreshold=0)
+                    agent.getAction(state)
+                    if abs(agent.rootValue) >= WIN_VALUE - DEPTH_SCALE:
+                        continue
+                    target = agent.rootValue // DEPTH_SCALE
+                else:
+                    target = _finalDifference(states[-1], player)
+                yield patternIndices(state.pieces[player], state.pieces[3 - player]), target - material
+
+
+def fitWeights(indices, targets, ridge=20.0, iterations=200, log=None):
+    # Ridge least squares over one-hot pattern features, solved by conjugate gradient
+    # on the normal equations; A and A^T are a gather and a bincount over `indices`.
+    import numpy as np
+
+    indices = np.asarray(indices, dtype=np.intp)
+    targets = np.asarray(targets, dtype=np.float64)
+    flatIndices = indices.ravel()
+
+    def normalProduct(weights):
+        residuals = weights[indices].sum(axis=1)
+        return np.bincount(flatIndices, weights=np.repeat(residuals, indices.shape[1]),
+                           minlength=NUM_WEIGHTS) + ridge * weights
+
+    weights = np.zeros(NUM_WEIGHTS)
+    residual = np.bincount(flatIndices, weights=np.repeat(targets, indices.shape[1]), minlength=NUM_WEIGHTS)
+    direction = residual.copy()
+    residualNorm = residual.dot(residual)
+    for iteration in range(iterations):
+        product = normalProduct(direction)
+        step = residualNorm / direction.dot(product)
+        weights += step * direction
+        residual -= step * product
+        nextNorm = residual.dot(residual)
+        if log is not None and iteration % 20 == 0:
+            error = weights[indices].sum(axis=1) - targets
+            log("iteration {}: rms error {:.3f}".format(iteration, float(np.sqrt((error ** 2).mean()))))
+        if nextNorm < 1e-12:
+            break
+        direction = residual + (nextNorm / residualNorm) * direction
+        residualNorm = nextNorm
+    return [int(round(weight * WEIGHT_SCALE)) for weight in weights]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit pattern weights to the positions of recorded games.")
+    parser.add_argument("records", nargs="+", help="GameRecord files, e.g. from League.py --record")
+    parser.add_argument("--out", default="pattern.weights")
+    parser.add_argument("--search-depth", type=int, default=2,
+                        help="fit to the alpha-beta value at this depth; 0 fits to the final result")
+    parser.add_argument("--skip-plies", type=int, default=0, help="ignore the first plies of every game")
+    parser.add_argument("--ridge", type=float, default=20.0)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    samples = list(gamePositions(args.records, args.search_depth, args.skip_plies))
+    sys.stderr.write("{} samples\n".format(len(samples)))
+    weights = fitWeights([sample[0] for sample in samples], [sample[1] for sample in samples],
+                         args.ridge, args.iterations, log=lambda message: sys.stderr.write(message + "\n"))
+    PatternEvaluator(weights).save(args.out)
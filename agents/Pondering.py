@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# Background search on the opponent's time. An agent starts pondering right after
+# it returns a move and stops it at the top of the next getAction, so the search
+# state (transposition table, MCTS tree) is only ever touched by one thread at a
+# time. Pondering only pays off when the agent outlives a move, e.g. in AgentServer.
+#
+# A ponder search ends by itself after ponderTimeLimit(timeLimit): the opponent's
+# move is limited like ours, and after the last move of a game no reply ever
+# comes, so an unbounded search would hold a core until the next game.
+import threading
+
+PONDER_LIMIT_SCALE = 1.5
+
+
+def ponderTimeLimit(timeLimit):
+    return float("inf") if timeLimit is None else PONDER_LIMIT_SCALE * timeLimit
+
+
+class Ponderer(object):
+    def __init__(self):
+        self.stopEvent = threading.Event()
+        self._thread = None
+        # start and stop may come from different threads, e.g. AgentServer's idle watchdog.
+        self._lock = threading.Lock()
+
+    def isRunning(self):
+        return self._thread is not None
+
+    def start(self, target, *args):
+        with self._lock:
+            self._stop()
+            self._thread = threading.Thread(target=target, args=args)
+            # A daemon thread never keeps a one-shot ai1.py / ai2.py process alive.
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        # The search polls stopEvent, so this returns within one poll interval.
+        if self._thread is None:
+            return
+        self.stopEvent.set()
+        self._thread.join()
+        self._thread = None
+        self.stopEvent.clear()
@@ -1,67 +1,7 @@
 import sys
 import random
-import copy
 
-class AtaxxState(object):
-    def __init__(self, board, turn):
-        self.board = board
-        self.turn = turn
-        self.possibleActions = None
-        self._updatePossibleActions()
-
-    def _updatePossibleActions(self):
-        possibleActions = []
-        dupDirection = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        movDirection = [(-2, -2), (-2, -1), (-2, 0), (-2, 1), (-2, 2), (-1, -2), (-1, 2), (0, -2),
-                        (0, 2), (1, -2), (1, 2), (2, -2), (2, -1), (2, 0), (2, 1), (2, 2)]
-
-        for i in range(7):
-            for j in range(7):
-                if self.board[i][j] == 0:
-                    for direction in dupDirection:
-                        x, y = i + direction[0], j + direction[1]
-                        if 0 <= x < 7 and 0 <= y < 7 and self.board[x][y] == self.turn:
-                            possibleActions.append((x, y, i, j))
-                            break
-
-        for i in range(7):
-            for j in range(7):
-                if self.board[i][j] == 0:
-                    for direction in movDirection:
-                        x, y = i + direction[0], j + direction[1]
-                        if 0 <= x < 7 and 0 <= y < 7 and self.board[x][y] == self.turn:
-                            possibleActions.append((x, y, i, j))
-        self.possibleActions = possibleActions
-
-    def step(self, action):
-        x, y, i, j = action
-
-        board = copy.deepcopy(self.board)
-        board[i][j] = self.turn
-        if abs(x - i) == 2 or abs(y - j) == 2:
-            board[x][y] = 0
-
-        for k in range(max(0, i - 1), min(7, i + 2)):
-            for l in range(max(0, j - 1), min(7, j + 2)):
-                if board[k][l] == 3 - self.turn:
-                    board[k][l] = self.turn
-
-        turn = 3 - self.turn
-        nextState = AtaxxState(board=board, turn=turn)
-        return nextState
-
-    def isTerminal(self):
-        return len(self.possibleActions) == 0
-
-    def winner(self):
-        playerScores = [None, 0, 0]
-        for i in range(7):
-            for j in range(7):
-                if self.board[i][j] == self.turn:
-                    playerScores[self.turn] += 1
-                else:
-                    playerScores[3 - self.turn] += 1
-        return 1 if playerScores[1] > playerScores[2] else 2
+from AtaxxState import AtaxxState, BOARD_SIZE, NEIGHBOR_MASKS, JUMP_MASKS, popcount
 
 
 class Agent(object):
@@ -72,69 +12,46 @@ class Agent(object):
         pass
 
 
+def moveScores(state):
+    # One pass over the legal moves, scoring each from the side to move:
+    #   eating  = stones captured at the destination, minus one for a jump
+    #   damaged = a jump whose vacated source leaves at least as many of our
+    #             stones next to an enemy as it captures
+    # score = 2 * eating + (0 if damaged else 1), so more captures always win and
+    # an undamaged move wins a tie.
+    own, opp = state.pieces[state.turn], state.pieces[3 - state.turn]
+    captures, exposed = {}, {}
+    actions, scores = state.possibleActions, []
+    for x, y, i, j in actions:
+        src, dst = x * BOARD_SIZE + y, i * BOARD_SIZE + j
+        if dst not in captures:
+            captures[dst] = popcount(NEIGHBOR_MASKS[dst] & opp)
+        eating = captures[dst]
+        damaged = False
+        if abs(x - i) == 2 or abs(y - j) == 2:
+            eating -= 1
+            if src not in exposed:
+                nearEnemy = (NEIGHBOR_MASKS[src] | JUMP_MASKS[src]) & opp
+                # None: no enemy within two squares, so the jump cannot be damaged.
+                exposed[src] = popcount(NEIGHBOR_MASKS[src] & own) + 1 if nearEnemy else None
+            damaged = exposed[src] is not None and eating <= exposed[src]
+        scores.append(2 * eating + (0 if damaged else 1))
+    return actions, scores
+
+
 class RuleBasedAgent(Agent):
     def __init__(self, player):
         super(RuleBasedAgent, self).__init__()
         self.player = player
 
-    def getAction(self, state):
-        actions_possible = {}
-        enemy = 3 - state.turn
-        for action in state.possibleActions:
-            a, b, x, y = action
-            if (a, b) in actions_possible.keys():
-                actions_possible[(a, b)].append((x, y))
-            else:
-                actions_possible[(a, b)] = [(x, y)]
-        max_eating = 0
-        max_actions = {}
-        max_damage_actions = {}
-        for position, actions in list(actions_possible.items()):
-            max_action_list = []
-            max_damage_action_list = []
-            for action in actions:
-                move = False
-                eating = 0
-                if abs(position[0] - action[0]) == 2 or abs(position[1] - action[1]) == 2:
-                    eating -= 1
-                    for i in range(max(position[0] - 2, 0), min(position[0] + 3, 7)):
-                        for j in range(max(position[1] - 2, 0), min(position[1] + 3, 7)):
-                            if state.board[i][j] == enemy:
-                                enemy_eating = 0
-                                move = True
-                for i in range(max(action[0] - 1, 0), min(action[0] + 2, 7)):
-                    for j in range(max(action[1] - 1, 0), min(action[1] + 2, 7)):
-                        if state.board[i][j] == enemy:
-                            eating += 1
-                if move:
-                    for i in range(max(position[0] - 1, 0), min(position[0] + 2, 7)):
-                        for j in range(max(position[1] - 1, 0), min(position[1] + 2, 7)):
-                            if state.board[i][j] == player:
-                                enemy_eating += 1
-                    if eating <= enemy_eating and eating == max_eating:
-                        max_damage_action_list.append(action)
-                        continue
-                if eating == max_eating:
-                    max_action_list.append(action)
-                if eating > max_eating:
-                    max_eating = eating
-                    max_actions = {}
-                    max_action_list = [action]
-                    max_damage_action_list = []
-            if max_action_list:
-                max_actions[position] = max_action_list
-                max_damage_actions[position] = max_damage_action_list
-
-        if list(max_actions.items()):
-            piece, positions = random.choice(list(max_actions.items()))
-            position = random.choice(positions)
-        else:
-            piece, positions = random.choice(list(max_damage_actions.items()))
-            position = random.choice(positions)
-
-        action_final = (piece[0], piece[1], position[0], position[1])
+    def getAction(self, state, startTime=None):
+        # startTime is accepted like the search agents', and unused: there is no search.
+        actions, scores = moveScores(state)
+        bestScore = max(scores)
+        action_final = random.choice([action for action, score in zip(actions, scores) if score == bestScore])
         return action_final
 
+
 if __name__ == "__main__":
     input_str = sys.stdin.read()
 
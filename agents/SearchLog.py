@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Per-move search records as JSON lines. Agents take searchLog=None; with a
+# SearchLog they time their search phases and write one record per move,
+# otherwise they skip the bookkeeping entirely.
+import sys
+import json
+import time
+
+
+class SearchLog(object):
+    def __init__(self, path=None):
+        # path None writes to stderr; files are opened for append so several
+        # engine processes can share one log.
+        self._file = open(path, "a") if path else sys.stderr
+        self._ownsFile = bool(path)
+
+    def write(self, record):
+        record["time"] = round(time.time(), 3)
+        self._file.write(json.dumps(record, sort_keys=True) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._ownsFile:
+            self._file.close()
+
+
+def openSearchLog(path):
+    return SearchLog(path) if path else None
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# The 8 symmetries of the board (rotations and reflections). A bitboard is
+# transformed with one table lookup per row: ROW_TABLES[t][row][bits] is the
+# image of that row's 7 bits. Symmetries never swap colours or the side to move.
+#
+# canonicalize() picks the smallest image of a position as its representative,
+# so symmetric positions share keys in books and other position stores; moves
+# found there are mapped back with transformAction(action, inverse(t)).
+from AtaxxState import BOARD_SIZE, NUM_SQUARES, SQUARE_COORDS, zobristHash
+
+LAST = BOARD_SIZE - 1
+ROW_MASK = (1 << BOARD_SIZE) - 1
+IDENTITY = 0
+# Transform t maps square (i, j) to COORD_TRANSFORMS[t](i, j).
+COORD_TRANSFORMS = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, LAST - i),
+    lambda i, j: (LAST - i, LAST - j),
+    lambda i, j: (LAST - j, i),
+    lambda i, j: (i, LAST - j),
+    lambda i, j: (LAST - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (LAST - j, LAST - i),
+]
+NUM_TRANSFORMS = len(COORD_TRANSFORMS)
+SQUARE_TRANSFORMS = [[transform(*SQUARE_COORDS[sq])[0] * BOARD_SIZE + transform(*SQUARE_COORDS[sq])[1]
+                      for sq in range(NUM_SQUARES)] for transform in COORD_TRANSFORMS]
+INVERSE_TRANSFORMS = [next(other for other in range(NUM_TRANSFORMS)
+                           if all(SQUARE_TRANSFORMS[other][SQUARE_TRANSFORMS[t][sq]] == sq for sq in range(NUM_SQUARES)))
+                      for t in range(NUM_TRANSFORMS)]
+
+
+def _rowTable(t, row):
+    table = []
+    for bits in range(1 << BOARD_SIZE):
+        image = 0
+        for column in range(BOARD_SIZE):
+            if bits >> column & 1:
+                image |= 1 << SQUARE_TRANSFORMS[t][row * BOARD_SIZE + column]
+        table.append(image)
+    return table
+
+
+ROW_TABLES = [[_rowTable(t, row) for row in range(BOARD_SIZE)] for t in range(NUM_TRANSFORMS)]
+
+
+def inverse(t):
+    return INVERSE_TRANSFORMS[t]
+
+
+def transformBitboard(bitboard, t):
+    if t == IDENTITY:
+        return bitboard
+    tables = ROW_TABLES[t]
+    image = 0
+    for row in range(BOARD_SIZE):
+        image |= tables[row][(bitboard >> (BOARD_SIZE * row)) & ROW_MASK]
+    return image
+
+
+def transformAction(action, t):
+    x, y, i, j = action
+    transform = COORD_TRANSFORMS[t]
+    return transform(x, y) + transform(i, j)
+
+
+def canonicalize(pieces):
+    # Returns ([None, player1, player2] of the representative, transform applied to reach it).
+    best, bestTransform = (pieces[1], pieces[2]), IDENTITY
+    for t in range(1, NUM_TRANSFORMS):
+        image = (transformBitboard(pieces[1], t), transformBitboard(pieces[2], t))
+        if image < best:
+            best, bestTransform = image, t
+    return [None, best[0], best[1]], bestTransform
+
+
+def canonicalHash(state):
+    # Zobrist hash of the representative; equal for all 8 images of a position.
+    canonicalPieces, t = canonicalize(state.pieces)
+    return zobristHash(canonicalPieces, state.turn), t
+
+
+def stabilizer(pieces):
+    # Transforms other than the identity that leave the position unchanged.
+    return [t for t in range(1, NUM_TRANSFORMS)
+            if transformBitboard(pieces[1], t) == pieces[1] and transformBitboard(pieces[2], t) == pieces[2]]
+
+
+def _moveKey(action):
+    # Clones onto the same square are the same move whatever their source.
+    x, y, i, j = action
+    if abs(x - i) <= 1 and abs(y - j) <= 1:
+        return -1, -1, i, j
+    return action
+
+
+def uniqueActions(state):
+    # Legal moves with one representative per class of moves that lead to
+    # symmetric positions, e.g. 5 of the 16 moves from the start position.
+    symmetries = stabilizer(state.pieces)
+    if not symmetries:
+        return state.possibleActions
+    actions, seen = [], set()
+    for action in state.possibleActions:
+        key = min(_moveKey(transformAction(action, t)) for t in [IDENTITY] + symmetries)
+        if key not in seen:
+            seen.add(key)
+            actions.append(action)
+    return actions
+
+
+def matchAction(state, action):
+    # The legal move of state equal to action, allowing a clone from another source; None if illegal.
+    key = _moveKey(action)
+    for candidate in state.possibleActions:
+        if _moveKey(candidate) == key:
+            return candidate
+    return None
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Per-move time budgets shared by AlphaBetaAgent and MCTSAgent. The agent's
+# timeLimit, counted from the start of the move's process when run one-shot and
+# less a safety margin, is the hard deadline. Inside
+# it a move gets a target from the game phase and the number of legal moves,
+# which is stretched while the search keeps changing its best move and cut once
+# it settles: the same best move over several checks, or a dominant share of the
+# MCTS root visits. Stopping early only pays when the time saved is spent
+# pondering, so without softTargets (one-shot ai1.py / ai2.py, which cannot carry
+# time over to the next move) every move searches to the hard deadline.
+import time
+
+from AtaxxState import popcount
+
+# Covers what the move's clock cannot see: interpreter start-up before the agent
+# module runs (or the shim's, in server mode), one deadline check, and exit.
+SAFETY_MARGIN = 0.3
+# Short time controls (League) keep at most this share of the limit as the margin.
+MAX_MARGIN_SHARE = 0.1
+# Target as a fraction of the hard budget, before the phase weight.
+BASE_SHARE = 0.6
+OPENING_EMPTIES = 40
+ENDGAME_EMPTIES = 12
+FEW_ACTIONS = 4
+STABLE_CHECKS = 3
+STABLE_SCALE = 0.5
+UNSTABLE_SCALE = 1.6
+DOMINANT_VISIT_SHARE = 0.6
+# Searches without natural iterations (MCTS) report this many times per target.
+CHECKS_PER_TARGET = 20
+
+
+def phaseWeight(empties, numActions):
+    # The middlegame decides most games; openings are largely symmetric or in the
+    # book, and the last few empties are left to the endgame solver.
+    if empties >= OPENING_EMPTIES:
+        weight = 0.6
+    elif empties >= ENDGAME_EMPTIES:
+        weight = 1.0
+    else:
+        weight = 0.8
+    if numActions <= FEW_ACTIONS:
+        weight *= 0.5
+    return weight
+
+
+class TimeManager(object):
+    def __init__(self, safetyMargin=SAFETY_MARGIN, baseShare=BASE_SHARE, softTargets=True):
+        self.safetyMargin = safetyMargin
+        self.baseShare = baseShare
+        self.softTargets = softTargets
+        self.reset()
+
+    def reset(self):
+        # Forgets the last move, e.g. before one answered without a search.
+        self.startTime, self.deadline, self.target, self.checkInterval = None, None, None, None
+        self._bestAction, self._stableChecks, self._changes, self._dominant = None, 0, 0, False
+
+    def startMove(self, state, startTime, timeLimit):
+        self.startTime = startTime
+        self.deadline = startTime + timeLimit - min(self.safetyMargin, MAX_MARGIN_SHARE * timeLimit)
+        share = 1.0
+        if self.softTargets:
+            share = min(1.0, self.baseShare * phaseWeight(popcount(state.empty()), len(state.possibleActions)))
+        self.target = (self.deadline - startTime) * share
+        self.checkInterval = self.target / CHECKS_PER_TARGET
+        self._bestAction, self._stableChecks, self._changes, self._dominant = None, 0, 0, False
+
+    def observe(self, bestAction, visitShare=None):
+        # Called after every completed iteration (alpha-beta) or check interval (MCTS).
+        if bestAction == self._bestAction:
+            self._stableChecks += 1
+        else:
+            if self._bestAction is not None:
+                self._changes += 1
+            self._bestAction, self._stableChecks = bestAction, 0
+        self._dominant = visitShare is not None and visitShare >= DOMINANT_VISIT_SHARE
+
+    def softDeadline(self):
+        if not self.softTargets:
+            return self.deadline
+        scale = 1.0
+        if self._dominant or self._stableChecks >= STABLE_CHECKS:
+            scale = STABLE_SCALE
+        elif self._changes and self._stableChecks == 0:
+            scale = UNSTABLE_SCALE
+        return min(self.deadline, self.startTime + self.target * scale)
+
+    def timeUp(self, projected=0.0):
+        # projected: expected length of the next iteration, which is only started if
+        # it should end by the soft deadline. The hard deadline is for aborting a
+        # search already running. Without soft targets the time is lost unless spent,
+        # so every iteration is tried, even one that may be aborted.
+        if not self.softTargets:
+            return time.time() >= self.deadline
+        return time.time() + projected >= self.softDeadline()
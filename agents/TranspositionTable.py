@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import ctypes
+from multiprocessing.sharedctypes import RawArray
+
+from AtaxxState import NO_ACTION, packAction, unpackAction
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# Rough CPython footprint of one stored (key, depth, flag, value, action) tuple
+# plus its list slot, used to turn a memory budget into a slot count.
+ENTRY_BYTES = 128
+
+# SharedTranspositionTable packs an entry into one 64-bit data word:
+#   bits 0-15 packed action | 16-23 depth | 24-25 flag | 26-57 value + VALUE_OFFSET
+SHARED_ENTRY_BYTES = 16
+VALUE_OFFSET = 1 << 31
+
+
+class TranspositionTable(object):
+    def __init__(self, memoryBudget=16 * 1024 * 1024):
+        numEntries = 1
+        while numEntries * 2 * ENTRY_BYTES <= memoryBudget:
+            numEntries *= 2
+        self.numEntries = numEntries
+        self._mask = numEntries - 1
+        self._entries = [None] * numEntries
+
+        self.hits, self.misses, self.collisions, self.stores = 0, 0, 0, 0
+
+    def clear(self):
+        self._entries = [None] * self.numEntries
+
+    def resetStats(self):
+        self.hits, self.misses, self.collisions, self.stores = 0, 0, 0, 0
+
+    def probe(self, key):
+        entry = self._entries[key & self._mask]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            self.misses += 1
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, flag, value, action):
+        # Depth-preferred: a shallower result never evicts a deeper one from another position.
+        index = key & self._mask
+        entry = self._entries[index]
+        if entry is None or entry[0] == key or depth >= entry[1]:
+            self._entries[index] = (key, depth, flag, value, action)
+            self.stores += 1
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "entries": self.numEntries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hitRate": self.hits / probes if probes else 0.0,
+        }
+
+
+class SharedTranspositionTable(object):
+    # Lock-free table in shared memory for several search processes. A slot is two
+    # 64-bit words, data and key ^ data, written without locking; a reader that
+    # catches a half-written slot sees a key mismatch and treats it as a miss.
+    def __init__(self, memoryBudget=16 * 1024 * 1024, words=None):
+        # words: the RawArray of an existing table, e.g. handed to a worker process.
+        if words is None:
+            numEntries = 1
+            while numEntries * 2 * SHARED_ENTRY_BYTES <= memoryBudget:
+                numEntries *= 2
+            words = RawArray(ctypes.c_uint64, 2 * numEntries)
+        self.words = words
+        # Indexing a memoryview of the words is cheaper than indexing the ctypes array.
+        self._view = memoryview(words).cast("B").cast("Q")
+        self.numEntries = len(words) // 2
+        self._mask = self.numEntries - 1
+
+        self.hits, self.misses, self.collisions, self.stores = 0, 0, 0, 0
+
+    def clear(self):
+        ctypes.memset(self.words, 0, ctypes.sizeof(self.words))
+
+    def resetStats(self):
+        self.hits, self.misses, self.collisions, self.stores = 0, 0, 0, 0
+
+    def probe(self, key):
+        words = self._view
+        index = (key & self._mask) << 1
+        data, check = words[index], words[index + 1]
+        # A stored data word is never 0 (the value field is offset), so an empty slot
+        # cannot match key 0.
+        if check ^ data != key or not data:
+            self.misses += 1
+            if data or check:
+                self.collisions += 1
+            return None
+        self.hits += 1
+        # The value field is the top of the word, so it needs no mask.
+        return (key, (data >> 16) & 0xFF, (data >> 24) & 3, (data >> 26) - VALUE_OFFSET, unpackAction(data & 0xFFFF))
+
+    def store(self, key, depth, flag, value, action):
+        # Depth-preferred, as in TranspositionTable.
+        index = (key & self._mask) << 1
+        words = self._view
+        oldData, oldCheck = words[index], words[index + 1]
+        if oldData == 0 and oldCheck == 0 or oldCheck ^ oldData == key or depth >= (oldData >> 16) & 0xFF:
+            data = (packAction(action) if action is not None else NO_ACTION) | depth << 16 | flag << 24 | \
+                (value + VALUE_OFFSET) << 26
+            words[index] = data
+            words[index + 1] = key ^ data
+            self.stores += 1
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "entries": self.numEntries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hitRate": self.hits / probes if probes else 0.0,
+        }
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Fixtures shared by the agent tests. Run them with python -m pytest from this directory.
+import os
+import random
+
+import pytest
+
+from AtaxxState import AtaxxState, initialBoard
+
+SEED = 20201120
+WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pattern.weights")
+
+
+def _randomPositions(count, seed=SEED, minPlies=0, maxPlies=40):
+    # count positions, none of them over, each after a random number of random plies.
+    rng, positions = random.Random(seed), []
+    while len(positions) < count:
+        state = AtaxxState(initialBoard(), 1)
+        for _ in range(rng.randrange(minPlies, maxPlies)):
+            if state.isTerminal():
+                break
+            state = state.step(rng.choice(state.possibleActions))
+        if not state.isTerminal():
+            positions.append(state)
+    return positions
+
+
+@pytest.fixture
+def seed():
+    return SEED
+
+
+@pytest.fixture
+def weightsPath():
+    return WEIGHTS_PATH
+
+
+@pytest.fixture
+def randomPositions():
+    return _randomPositions
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# A long-lived AgentServer must outlive shims that drop their connection and
+# messages its agent cannot handle.
+import os
+import sys
+import random
+import time
+import threading
+
+import pytest
+
+from AgentServer import AgentServer, FALLBACK_MARGIN, MOVE_TIME_LIMIT, _answerInProcess, _connect
+from AtaxxState import AtaxxState, initialBoard
+from GameRecord import readGames
+
+KEY = b"k" * 32
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="serves on a Unix socket")
+
+
+def playMessage(board):
+    return "PLAY\n" + "\n".join(" ".join(str(cell) for cell in row) for row in board) + "\n"
+
+
+@pytest.fixture
+def address(tmp_path):
+    address = os.path.join(str(tmp_path), "server.sock")
+    server = AgentServer("Random", 1, address=address, key=KEY)
+    thread = threading.Thread(target=server.serveForever)
+    thread.daemon = True
+    thread.start()
+    return address
+
+
+def request(address, message):
+    with _connect(address, KEY, 5.0) as connection:
+        connection.send_bytes(message.encode("utf-8"))
+        return connection.recv_bytes().decode("utf-8")
+
+
+def testSurvivesDroppedConnections(address):
+    _connect(address, KEY, 5.0).close()
+    connection = _connect(address, KEY, 5.0)
+    connection.send_bytes(playMessage(initialBoard()).encode("utf-8"))
+    connection.close()
+
+    action = tuple(int(value) for value in request(address, playMessage(initialBoard())).split())
+    assert action in AtaxxState(initialBoard(), 1).possibleActions
+
+
+def testSurvivesMalformedMessages(address):
+    assert request(address, "PLAY\n1 2 x\n") == ""
+    assert request(address, "READY\n") == "OK"
+
+
+def testRecordsGamesWithOpponentMoves(tmp_path, monkeypatch, seed):
+    # The server only sees the positions it moves in; the record must still hold
+    # the opponent's moves, and is written when the next game starts.
+    recordPath = os.path.join(str(tmp_path), "games.atxr")
+    monkeypatch.setenv("ATAXX_GAME_RECORD", recordPath)
+    server = AgentServer("Random", 2, key=KEY)
+    opponent = random.Random(seed)
+
+    state, actions = AtaxxState(initialBoard(), 1), []
+    while not state.isTerminal():
+        if state.turn == 1:
+            action = opponent.choice(state.possibleActions)
+        else:
+            action = tuple(int(value) for value in server.handleMessage(playMessage(state.board)).split())
+        actions.append(action)
+        state = state.step(action)
+    assert server.handleMessage("READY\n") == "OK"
+
+    records = list(readGames(recordPath))
+    assert len(records) == 1
+    assert records[0].agents == ("?", "Random")
+    # The game is complete up to our last move; a final opponent move is never shown to us.
+    recorded = records[0].actions
+    assert recorded == actions[:len(recorded)] and len(actions) - len(recorded) <= 1
+    assert records[0].result == (state.winner() if len(recorded) == len(actions) else 0)
+
+
+@pytest.mark.parametrize("elapsed", [5.0, MOVE_TIME_LIMIT - 0.2])
+def testFallbackKeepsToMoveLimit(elapsed, randomPositions):
+    # The shim started `elapsed` seconds ago; the in-process answer must still end
+    # within the move's limit, searching if there is time and playing a cheap move if not.
+    state = randomPositions(1, minPlies=4, maxPlies=30)[0]
+    startTime = time.time() - elapsed
+    answer = _answerInProcess("AlphaBeta", state.turn, playMessage(state.board), startTime)
+    assert time.time() - startTime <= max(MOVE_TIME_LIMIT - FALLBACK_MARGIN, elapsed) + 0.1
+    assert tuple(int(value) for value in answer.split()) in state.possibleActions
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# A timed AlphaBetaAgent search must return within its time limit.
+import time
+
+import pytest
+
+from AlphaBetaAgent import AlphaBetaAgent
+from PatternEvaluation import openPatternEvaluator
+
+TIME_LIMIT = 0.2
+# Slack for one clock check and unwinding the search.
+EPSILON = 0.05
+
+
+@pytest.mark.parametrize("withEvaluator", [False, True])
+def testSearchEndsByTimeLimit(withEvaluator, weightsPath, randomPositions):
+    evaluator = openPatternEvaluator(weightsPath) if withEvaluator else None
+    for state in randomPositions(4, minPlies=4, maxPlies=30):
+        agent = AlphaBetaAgent(maxDepth=49, player=state.turn, timeLimit=TIME_LIMIT, evaluator=evaluator)
+        startTime = time.time()
+        action = agent.getAction(state)
+        assert time.time() - startTime <= TIME_LIMIT + EPSILON
+        assert action in state.possibleActions
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# The bitboard AtaxxState against the list-based engine it replaced, and the
+# incremental state that make/unmake and step keep.
+import copy
+
+import pytest
+
+from AtaxxState import AtaxxState, popcount, zobristHash
+from Benchmark import POSITIONS, perft, positionState
+
+CLONE_DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+JUMP_DIRECTIONS = [(-2, -2), (-2, -1), (-2, 0), (-2, 1), (-2, 2), (-1, -2), (-1, 2), (0, -2),
+                   (0, 2), (1, -2), (1, 2), (2, -2), (2, -1), (2, 0), (2, 1), (2, 2)]
+
+
+class ListState(object):
+    # The original list-of-lists engine, kept as the reference for move generation.
+    def __init__(self, board, turn):
+        self.board, self.turn = board, turn
+        self.possibleActions = []
+        for directions, firstOnly in ((CLONE_DIRECTIONS, True), (JUMP_DIRECTIONS, False)):
+            for i in range(7):
+                for j in range(7):
+                    if self.board[i][j] != 0:
+                        continue
+                    for di, dj in directions:
+                        x, y = i + di, j + dj
+                        if 0 <= x < 7 and 0 <= y < 7 and self.board[x][y] == self.turn:
+                            self.possibleActions.append((x, y, i, j))
+                            if firstOnly:
+                                break
+
+    def step(self, action):
+        x, y, i, j = action
+        board = copy.deepcopy(self.board)
+        board[i][j] = self.turn
+        if abs(x - i) == 2 or abs(y - j) == 2:
+            board[x][y] = 0
+        for k in range(max(0, i - 1), min(7, i + 2)):
+            for l in range(max(0, j - 1), min(7, j + 2)):
+                if board[k][l] == 3 - self.turn:
+                    board[k][l] = self.turn
+        return ListState(board, 3 - self.turn)
+
+
+def listPerft(state, depth):
+    if depth == 1:
+        return len(state.possibleActions)
+    return sum(listPerft(state.step(action), depth - 1) for action in state.possibleActions)
+
+
+def assertConsistent(state):
+    assert state.counts[1:] == [popcount(state.pieces[1]), popcount(state.pieces[2])]
+    assert state.hash == zobristHash(state.pieces, state.turn)
+
+
+def snapshot(state):
+    return list(state.pieces), list(state.counts), state.hash, state.turn, list(state.possibleActions)
+
+
+@pytest.mark.parametrize("name", sorted(POSITIONS))
+def testPerftMatchesListEngine(name):
+    state = positionState(name)
+    reference = ListState(state.board, state.turn)
+    for depth in (1, 2, 3):
+        assert perft(state, depth) == listPerft(reference, depth)
+
+
+def testMovesMatchListEngine(randomPositions):
+    # Clones may come from another adjacent source, so the positions reached are compared.
+    for state in randomPositions(50):
+        reference = ListState(state.board, state.turn)
+        assert sorted(state.step(action).board for action in state.possibleActions) == \
+            sorted(reference.step(action).board for action in reference.possibleActions)
+        assert perft(state, 2) == listPerft(reference, 2)
+
+
+def testMakeUnmakeRestoresState(randomPositions):
+    for state in randomPositions(30):
+        before = snapshot(state)
+        for action in state.possibleActions:
+            child = state.step(action)
+            undoRecord = state.make(action)
+            assert (state.pieces, state.counts, state.hash, state.turn) == \
+                (child.pieces, child.counts, child.hash, child.turn)
+            if not state.isTerminal():
+                # One more ply and back, so nested records restore in order.
+                innerRecord = state.make(state.possibleActions[-1])
+                state.unmake(innerRecord)
+            assert (state.pieces, state.counts, state.hash) == (child.pieces, child.counts, child.hash)
+            state.unmake(undoRecord)
+            assert snapshot(state) == before
+
+
+def testIncrementalHashMatchesFromScratch(randomPositions):
+    for state in randomPositions(30):
+        assertConsistent(state)
+        for action in state.possibleActions:
+            assertConsistent(state.step(action))
+            undoRecord = state.make(action)
+            assertConsistent(state)
+            state.unmake(undoRecord)
+        assertConsistent(state)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# The batched NumPy rollouts must score games exactly like MCTSAgent._simulate.
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from BatchRollout import BatchRollout
+from MCTSAgent import MCTSAgent
+from MCTSTree import DRAW
+from PatternEvaluation import PatternEvaluator
+
+
+def serialWinner(agent, state):
+    return agent._simulate(None, None, state.copy())
+
+
+@pytest.mark.parametrize("withEvaluator", [False, True])
+def testCutoffMatchesSerial(withEvaluator, seed, weightsPath, randomPositions):
+    evaluator = PatternEvaluator.load(weightsPath) if withEvaluator else None
+    agent = MCTSAgent(1, 1, rolloutDepth=0, evaluator=evaluator, randomSeed=seed)
+    states = randomPositions(200)
+    batch = BatchRollout(seed, evaluator)
+    winners = batch.run(states, 0)
+    assert batch.plies == 0
+    assert winners == [serialWinner(agent, state) for state in states]
+    if not withEvaluator:
+        assert DRAW in winners
+
+
+def testRolloutDepthMatchesSerial(seed, randomPositions):
+    # With one ply left, every batched result must be a result the serial rollout
+    # can reach from the same position, and exactly one move is played per game.
+    agent = MCTSAgent(1, 1, rolloutDepth=1, randomSeed=seed)
+    states = randomPositions(100)
+    batch = BatchRollout(seed)
+    winners = batch.run(states, 1)
+    assert batch.plies == len(states)
+    for state, winner in zip(states, winners):
+        outcomes = set()
+        for action in state.possibleActions:
+            child = state.step(action)
+            outcomes.add(child.winner() if child.isTerminal() else agent._cutoffWinner(child))
+        assert winner in outcomes
+        assert serialWinner(agent, state) in outcomes
+        assert agent._rolloutPlies == 1
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# EndgameSolver against plain minimax. Jumps keep the number of empty squares,
+# so the reference propagates the interval of possible results down to a fixed
+# depth; on most positions with one empty square the interval closes to the
+# exact value.
+import random
+
+import pytest
+
+from AtaxxState import AtaxxState, NUM_SQUARES, BOARD_SIZE
+from EndgameSolver import EndgameSolver
+
+TIME_LIMIT = 10.0
+
+
+def bruteForce(state, depth, memo):
+    # (lowest, highest) final piece difference for the side to move over all
+    # results still possible after depth plies.
+    if not state.hasAnyMove():
+        value = 2 * state.counts[state.turn] - NUM_SQUARES
+        return value, value
+    if depth == 0:
+        return -NUM_SQUARES, NUM_SQUARES
+    key = (state.pieces[1], state.pieces[2], state.turn, depth)
+    if key not in memo:
+        lower = upper = -NUM_SQUARES - 1
+        for action in state.possibleActions:
+            childLower, childUpper = bruteForce(state.step(action), depth - 1, memo)
+            lower, upper = max(lower, -childUpper), max(upper, -childLower)
+        memo[key] = lower, upper
+    return memo[key]
+
+
+def endgamePositions(count, empties, seed):
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(count):
+        board = [[rng.choice((1, 2)) for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        for sq in rng.sample(range(NUM_SQUARES), empties):
+            board[sq // BOARD_SIZE][sq % BOARD_SIZE] = 0
+        positions.append(AtaxxState(board, rng.choice((1, 2))))
+    return positions
+
+
+def assertAgrees(state, depth, timeLimit=TIME_LIMIT):
+    lower, upper = bruteForce(state, depth, {})
+    action, solverLower, solverUpper = EndgameSolver().solve(state, timeLimit)
+    assert -NUM_SQUARES <= solverLower <= solverUpper <= NUM_SQUARES
+    # Both intervals hold the true result.
+    assert max(lower, solverLower) <= min(upper, solverUpper)
+    if lower == upper:
+        assert solverLower == solverUpper == lower or (solverLower > 0 and lower > 0) or \
+            (solverUpper < 0 and lower < 0)
+    if action is not None:
+        # The move can still reach the result it is meant to guarantee.
+        childLower, _ = bruteForce(state.step(action), depth - 1, {})
+        assert -childLower >= solverLower
+    return lower == upper
+
+
+def testExactValuesWithOneEmptySquare(seed):
+    exact = sum(assertAgrees(state, 6) for state in endgamePositions(20, 1, seed))
+    assert exact >= 15
+
+
+def testBoundsWithTwoEmptySquares(seed):
+    # Deep lines are not needed for the bounds to hold, so the solver is cut short.
+    for state in endgamePositions(10, 2, seed):
+        assertAgrees(state, 3, timeLimit=0.2)
+
+
+def testNoMoveLosesEmptySquares():
+    # Player 1 to move has no piece within reach of the empty corner.
+    board = [[1] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    for i in range(3):
+        for j in range(3):
+            board[i][j] = 2
+    board[0][0] = 0
+    state = AtaxxState(board, 1)
+    assert not state.hasAnyMove()
+    assert EndgameSolver().solve(state, TIME_LIMIT)[1:] == (2 * 40 - NUM_SQUARES,) * 2
+
+
+@pytest.mark.parametrize("empties", [1, 2])
+def testProvenActionIsApplicable(empties, seed):
+    solver = EndgameSolver(emptyThreshold=1)
+    for state in endgamePositions(5, empties, seed):
+        action = solver.provenAction(state, TIME_LIMIT)
+        if empties > 1:
+            assert action is None
+        elif action is not None:
+            assert action in state.possibleActions
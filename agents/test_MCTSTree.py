@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# MCTS-Solver proofs in both tree stores: how a decided game is carried up the
+# tree, and that selection and the final choice respect it.
+import pytest
+
+from AtaxxState import AtaxxState, initialBoard
+from MCTSAgent import MCTSNodeTree
+from MCTSTree import MCTSTree, NO_NODE, PROVEN_LOSS, PROVEN_WIN, UNPROVEN
+
+TREES = [MCTSTree, MCTSNodeTree]
+EXPLORATION = 0.5
+
+
+@pytest.fixture(params=TREES, ids=lambda treeClass: treeClass.__name__)
+def tree(request):
+    # Root at the start position, expanded two plies deep along its first move.
+    state = AtaxxState(initialBoard(), 1)
+    tree = request.param(3 - state.turn)
+    tree.expand(tree.root, state)
+    first = list(tree.children(tree.root))[0]
+    tree.expand(first, state.step(tree.action(first)))
+    return tree
+
+
+def player(tree, node):
+    # The side that moved into node.
+    return node.player if isinstance(tree, MCTSNodeTree) else tree.players[node]
+
+
+def isNoNode(node):
+    return node is None or node is NO_NODE
+
+
+def visitAll(tree, node, winner, times):
+    for child in tree.children(node):
+        for _ in range(times):
+            tree.backpropagate(child, winner)
+
+
+def testWinProvesParentLost(tree):
+    child = list(tree.children(tree.root))[1]
+    tree.solve(child, player(tree, child))
+    assert tree.proven(child) == PROVEN_WIN
+    assert tree.proven(tree.root) == PROVEN_LOSS
+    assert tree.bestAction() == tree.action(child)
+
+
+def testWinningReplyProvesMoveLost(tree):
+    first = list(tree.children(tree.root))[0]
+    reply = list(tree.children(first))[0]
+    tree.solve(reply, player(tree, reply))
+    assert tree.proven(reply) == PROVEN_WIN
+    assert tree.proven(first) == PROVEN_LOSS
+    # Other moves are still open, so the root is not decided.
+    assert tree.proven(tree.root) == UNPROVEN
+    assert all(tree.proven(child) == UNPROVEN for child in list(tree.children(tree.root))[1:])
+
+
+def testLossProvesParentOnlyWhenAllRepliesLose(tree):
+    first = list(tree.children(tree.root))[0]
+    replies = list(tree.children(first))
+    for reply in replies[:-1]:
+        tree.solve(reply, 3 - player(tree, reply))
+        assert tree.proven(reply) == PROVEN_LOSS
+        assert tree.proven(first) == UNPROVEN
+    tree.solve(replies[-1], 3 - player(tree, replies[-1]))
+    assert tree.proven(first) == PROVEN_WIN
+    # A won move proves the root lost for the side that moved into it.
+    assert tree.proven(tree.root) == PROVEN_LOSS
+
+
+@pytest.mark.parametrize("selectionPolicy", ["uct", "puct"])
+def testChooseChildSkipsProvenLosses(tree, selectionPolicy):
+    children = list(tree.children(tree.root))
+    sideToMove = player(tree, children[0])
+    visitAll(tree, tree.root, 3 - sideToMove, 2)
+    # The move about to be proven lost has by far the best record.
+    for _ in range(50):
+        tree.backpropagate(children[0], sideToMove)
+    assert tree.chooseChild(tree.root, EXPLORATION, selectionPolicy) == children[0]
+
+    reply = list(tree.children(children[0]))[0]
+    tree.solve(reply, player(tree, reply))
+    for _ in range(len(children)):
+        chosen = tree.chooseChild(tree.root, EXPLORATION, selectionPolicy)
+        assert chosen != children[0]
+        tree.backpropagate(chosen, sideToMove)
+
+
+def testChooseChildFindsNothingWhenAllMovesLose(tree):
+    for child in tree.children(tree.root):
+        tree.solve(child, 3 - player(tree, child))
+    assert tree.proven(tree.root) == PROVEN_WIN
+    assert isNoNode(tree.chooseChild(tree.root, EXPLORATION))
+
+
+def testBestActionAvoidsProvenLoss(tree):
+    children = list(tree.children(tree.root))
+    visitAll(tree, tree.root, player(tree, children[0]), 1)
+    for _ in range(50):
+        tree.backpropagate(children[0], player(tree, children[0]))
+    tree.solve(children[0], 3 - player(tree, children[0]))
+    assert tree.bestAction() != tree.action(children[0])
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# A built book written to disk answers, through mmap, for its positions and
+# their symmetric images.
+import pytest
+
+from AtaxxState import AtaxxState, initialBoard
+from OpeningBook import OpeningBook, buildBook, openOpeningBook, writeBook
+from Symmetry import NUM_TRANSFORMS, canonicalHash, inverse, transformAction, transformBitboard
+
+PLIES = 3
+DEPTH = 1
+
+
+@pytest.fixture(scope="module")
+def book(tmp_path_factory):
+    entries = buildBook(PLIES, DEPTH)
+    path = str(tmp_path_factory.mktemp("book") / "book.bin")
+    writeBook(path, entries)
+    openedBook = OpeningBook(path)
+    yield entries, openedBook
+    openedBook.close()
+
+
+def bookPositions(entries):
+    # Positions of the first plies whose canonical form is in the book.
+    positions, frontier = [], [AtaxxState(initialBoard(), 1)]
+    for _ in range(PLIES):
+        positions.extend(state for state in frontier if canonicalHash(state)[0] in entries)
+        frontier = [state.step(action) for state in frontier for action in state.possibleActions]
+    return positions
+
+
+def transformState(state, t):
+    pieces = [None, transformBitboard(state.pieces[1], t), transformBitboard(state.pieces[2], t)]
+    return AtaxxState.fromBitboards(pieces, state.turn)
+
+
+def testProbeReturnsStoredEntries(book):
+    entries, openedBook = book
+    assert entries
+    for key, (action, score, depth) in entries.items():
+        assert openedBook.probe(key) == (action, score, depth)
+    assert openedBook.numSlots >= 2 * len(entries)
+
+
+def testLookupPlaysBookMove(book):
+    entries, openedBook = book
+    positions = bookPositions(entries)
+    assert positions
+    for state in positions:
+        key, transform = canonicalHash(state)
+        action = openedBook.lookup(state)
+        assert action in state.possibleActions
+        expected = state.step(transformAction(entries[key][0], inverse(transform)))
+        assert state.step(action).pieces == expected.pieces
+
+
+@pytest.mark.parametrize("t", range(NUM_TRANSFORMS))
+def testLookupOnTransformedPosition(book, t):
+    entries, openedBook = book
+    for state in bookPositions(entries):
+        image = transformState(state, t)
+        action = openedBook.lookup(image)
+        assert action in image.possibleActions
+        # A symmetric position may answer with a symmetric move, so results are compared canonically.
+        expected = transformState(state.step(openedBook.lookup(state)), t)
+        assert canonicalHash(image.step(action))[0] == canonicalHash(expected)[0]
+
+
+def testLookupMissesUnknownPosition(book):
+    # Clones come first, so this line has more pieces than any book position.
+    _, openedBook = book
+    state = AtaxxState(initialBoard(), 1)
+    for _ in range(PLIES + 2):
+        state = state.step(state.possibleActions[0])
+    assert openedBook.lookup(state) is None
+
+
+def testOpenOpeningBookWithoutFile(tmp_path):
+    assert openOpeningBook(None) is None
+    assert openOpeningBook(str(tmp_path / "missing.bin")) is None
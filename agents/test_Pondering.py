@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Pondering must end by itself: after its time cap, or once an MCTS tree is full.
+import time
+
+from AlphaBetaAgent import AlphaBetaAgent
+from MCTSAgent import MCTSAgent
+from Pondering import ponderTimeLimit
+
+TIME_LIMIT = 0.2
+# Slack for one clock check and the thread's exit.
+EPSILON = 0.1
+
+
+def ponderSeconds(agent):
+    startTime = time.time()
+    agent._ponderer._thread.join()
+    return time.time() - startTime
+
+
+def testAlphaBetaPonderingEndsAtTimeCap(randomPositions):
+    state = randomPositions(1, minPlies=4, maxPlies=30)[0]
+    agent = AlphaBetaAgent(maxDepth=49, player=state.turn, timeLimit=TIME_LIMIT, ponder=True)
+    agent.getAction(state)
+    assert ponderSeconds(agent) <= ponderTimeLimit(TIME_LIMIT) + EPSILON
+    agent.close()
+
+
+def testMCTSPonderingEndsWhenTreeIsFull(randomPositions):
+    state = randomPositions(1, minPlies=4, maxPlies=30)[0]
+    agent = MCTSAgent(TIME_LIMIT, state.turn, treeStorage="array", maxNodes=2000, ponder=True)
+    agent.getAction(state)
+    assert ponderSeconds(agent) < ponderTimeLimit(TIME_LIMIT)
+    assert agent._tree.size >= agent.maxNodes
+    agent.close()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# Every board symmetry maps positions and moves consistently, and symmetric
+# positions share one canonical form.
+import pytest
+
+from AtaxxState import AtaxxState, initialBoard
+from Symmetry import (NUM_TRANSFORMS, canonicalHash, canonicalize, inverse, matchAction, transformAction,
+                      transformBitboard, uniqueActions)
+
+
+def transformState(state, t):
+    pieces = [None, transformBitboard(state.pieces[1], t), transformBitboard(state.pieces[2], t)]
+    return AtaxxState.fromBitboards(pieces, state.turn)
+
+
+@pytest.mark.parametrize("t", range(NUM_TRANSFORMS))
+def testPositionRoundTrip(t, randomPositions):
+    for state in randomPositions(20):
+        image = transformState(state, t)
+        assert image.counts == state.counts
+        assert transformState(image, inverse(t)).pieces == state.pieces
+        assert canonicalize(image.pieces)[0] == canonicalize(state.pieces)[0]
+        assert canonicalHash(image)[0] == canonicalHash(state)[0]
+
+
+@pytest.mark.parametrize("t", range(NUM_TRANSFORMS))
+def testCanonicalTransformReachesRepresentative(t, randomPositions):
+    for state in randomPositions(20):
+        image = transformState(state, t)
+        canonicalPieces, canonicalTransform = canonicalize(image.pieces)
+        assert transformState(image, canonicalTransform).pieces == canonicalPieces
+
+
+@pytest.mark.parametrize("t", range(NUM_TRANSFORMS))
+def testActionRoundTrip(t, randomPositions):
+    for state in randomPositions(20):
+        image = transformState(state, t)
+        assert len(image.possibleActions) == len(state.possibleActions)
+        for action in state.possibleActions:
+            assert transformAction(transformAction(action, t), inverse(t)) == action
+            imageAction = matchAction(image, transformAction(action, t))
+            assert imageAction is not None
+            assert image.step(imageAction).pieces == transformState(state.step(action), t).pieces
+            assert matchAction(state, transformAction(imageAction, inverse(t))) is not None
+
+
+def testMatchActionRejectsIllegalMoves():
+    state = AtaxxState(initialBoard(), 1)
+    assert matchAction(state, (3, 3, 3, 4)) is None
+
+
+def testUniqueActionsAtStart():
+    assert len(uniqueActions(AtaxxState(initialBoard(), 1))) == 5